@@ -1,4 +1,4 @@
-from flask import Flask, redirect, url_for
+from flask import Flask, redirect, request, url_for
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, current_user
 from config import Config
@@ -58,6 +58,58 @@ def create_app():
     app.register_blueprint(financiamento_bp, url_prefix='/financiamentos')
     app.register_blueprint(extrato_crediario_bp, url_prefix='/extratos_crediarios')
 
+    # AUDITORIA (gravação em lote em segundo plano)
+    from app.services.audit_sink import audit_sink
+    audit_sink.init_app(app)
+
+    # CACHE DE RESULTADOS (extratos)
+    from app.services.cache_resultados import cache_resultados
+    cache_resultados.init_app(app)
+
+    # BARRAMENTO DE INVALIDAÇÃO (caches locais entre workers, via LISTEN/NOTIFY)
+    from app.services.barramento_invalidacao import barramento
+    barramento.init_app(app)
+
+    # ENDEREÇO DO CLIENTE ATRÁS DE PROXY REVERSO (IP real para o limite de login e a auditoria)
+    proxies = app.config.get('PROXIES_CONFIAVEIS', 0)
+    if proxies:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+    else:
+        _avisar_proxy_nao_configurado(app)
+
+    # LIMITE DE TENTATIVAS DE LOGIN
+    from app.services.limitador_login import limitador_login
+    limitador_login.init_app(app)
+
+    # INSTRUMENTAÇÃO
+    from app.utils.query_budget import init_query_budget
+    init_query_budget(app)
+    from app.utils.request_timing import init_request_timing
+    init_request_timing(app)
+
+    # MÉTRICAS (/metrics no formato do Prometheus)
+    from app.services.metricas import metricas
+    metricas.init_app(app)
+
+    # ETAG DAS LISTAS (geração dos dados por usuário)
+    from app.utils.etag import init_etag
+    init_etag(app)
+
+    # REGISTRAR COMANDOS CLI
+    from app.services.saldo_mensal_service import rebuild_saldos_mensais_command
+    app.cli.add_command(rebuild_saldos_mensais_command)
+    from app.services.fato_mensal_service import rebuild_fatos_mensais_command
+    app.cli.add_command(rebuild_fatos_mensais_command)
+    from app.services.audit_log_particao_service import audit_log_cli
+    app.cli.add_command(audit_log_cli)
+    from app.services.indices_service import indices_cli
+    app.cli.add_command(indices_cli)
+    from app.services.senha_service import calibrar_hash_senha_command
+    app.cli.add_command(calibrar_hash_senha_command)
+    from app.services.seed_service import seed_command
+    app.cli.add_command(seed_command)
+
     # Rota raiz para redirecionar para o login ou para a página inicial padrão
     @app.route('/')
     def index():
@@ -67,6 +119,18 @@ def create_app():
 
     return app
 
+def _avisar_proxy_nao_configurado(app):
+    avisado = []
+
+    @app.before_request
+    def _verificar_x_forwarded_for():
+        if not avisado and request.headers.get('X-Forwarded-For'):
+            avisado.append(True)
+            app.logger.warning(
+                "Requisição com X-Forwarded-For, mas PROXIES_CONFIAVEIS=0: o limite de login por IP "
+                "trata todos os clientes como o endereço do proxy (%s)", request.remote_addr
+            )
+
 def init_db():
     app = create_app()
     with app.app_context():
@@ -85,6 +149,8 @@ def init_db():
         import app.models.renda_movimento_model
         import app.models.financiamento_model
         import app.models.financiamento_parcela_model
+        import app.models.conta_saldo_mensal_model
+        import app.models.fato_mensal_model
         db.create_all()
         print("Tabelas do banco de dados criadas/verificadas.")
 
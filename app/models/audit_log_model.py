@@ -1,11 +1,15 @@
 # app/models/audit_log_model.py
 from app import db
 from datetime import datetime
+from sqlalchemy import Index, PrimaryKeyConstraint, event
+from sqlalchemy.ext.compiler import compiles
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_log'
 
-    id = db.Column(db.Integer, primary_key=True)
+    # No PostgreSQL a tabela é particionada por mês em "timestamp", por isso lá a coluna
+    # entra na chave primária (ver _chave_primaria_particionada); nos demais bancos a chave é só o id.
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=True) 
     username = db.Column(db.String(80), nullable=False) 
     event_type = db.Column(db.String(50), nullable=False) 
@@ -15,5 +19,30 @@ class AuditLog(db.Model):
 
     user = db.relationship('Usuario', backref=db.backref('audit_logs', lazy=True))
 
+    __table_args__ = (
+        # Listagem paginada (mais recentes primeiro) e filtros por usuário e por tipo de evento
+        Index('ix_audit_log_timestamp_id', 'timestamp', 'id'),
+        Index('ix_audit_log_user_timestamp', 'user_id', 'timestamp'),
+        Index('ix_audit_log_event_type_timestamp', 'event_type', 'timestamp'),
+        {'postgresql_partition_by': 'RANGE (timestamp)', 'info': {'chave_particao': 'timestamp'}},
+    )
+
     def __repr__(self):
         return f"<AuditLog {self.event_type} - User: {self.username} - {self.timestamp}>"
+
+@compiles(PrimaryKeyConstraint, 'postgresql')
+def _chave_primaria_particionada(constraint, compiler, **kw):
+    # A chave primária de uma tabela particionada precisa incluir a coluna da partição
+    particao = constraint.table.info.get('chave_particao')
+    if particao is None:
+        return compiler.visit_primary_key_constraint(constraint, **kw)
+    colunas = [coluna.name for coluna in constraint.columns] + [particao]
+    nome = f'CONSTRAINT {compiler.preparer.format_constraint(constraint)} ' if constraint.name is not None else ''
+    return f"{nome}PRIMARY KEY ({', '.join(compiler.preparer.quote(coluna) for coluna in colunas)})"
+
+@event.listens_for(AuditLog.__table__, 'after_create')
+def _criar_particoes_iniciais(tabela, conexao, **kw):
+    # Sem partições a tabela particionada recusa qualquer INSERT: db.create_all() já cria as do mês atual em diante
+    if conexao.dialect.name == 'postgresql':
+        from app.services.audit_log_particao_service import garantir_particoes
+        garantir_particoes(conexao)
@@ -1,6 +1,7 @@
 # app/models/conta_movimento_model.py
 from app import db
 from datetime import datetime
+from sqlalchemy import Index
 
 class ContaMovimento(db.Model):
     __tablename__ = 'conta_movimento'
@@ -18,5 +19,12 @@ class ContaMovimento(db.Model):
     conta = db.relationship('Conta', backref=db.backref('movimentos', lazy=True))
     conta_transacao_item = db.relationship('ContaTransacao', backref=db.backref('movimentos', lazy=True))
 
+    __table_args__ = (
+        # Extrato e reconstrução do saldo mensal por conta e período
+        Index('ix_conta_movimento_conta_data', 'conta_id', 'data'),
+        # Listagem paginada por cursor (percorrida nos dois sentidos, então a ordem do índice não importa)
+        Index('ix_conta_movimento_usuario_data', 'usuario_id', 'data', 'data_criacao', 'id'),
+    )
+
     def __repr__(self):
         return f"<ContaMovimento {self.id} - Conta: {self.conta_id} - Valor: {self.valor}>"
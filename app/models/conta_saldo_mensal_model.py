@@ -0,0 +1,23 @@
+# app/models/conta_saldo_mensal_model.py
+from app import db
+from sqlalchemy import UniqueConstraint
+
+class ContaSaldoMensal(db.Model):
+    __tablename__ = 'conta_saldo_mensal'
+
+    id = db.Column(db.Integer, primary_key=True)
+    conta_id = db.Column(db.Integer, db.ForeignKey('conta.id'), nullable=False)
+    mes = db.Column(db.Date, nullable=False) # Primeiro dia do mês de referência
+    # Soma (créditos - débitos) de todos os movimentos da conta até o fim do mês, sem o saldo inicial da conta
+    saldo_acumulado = db.Column(db.Numeric(14, 2), nullable=False, default=0.00)
+
+    # Checkpoints são excluídos junto com a conta
+    conta = db.relationship('Conta', backref=db.backref('saldos_mensais', lazy=True, cascade="all, delete-orphan"))
+
+    # Índice único combinado (também atende a busca do checkpoint mais recente de uma conta)
+    __table_args__ = (
+        UniqueConstraint('conta_id', 'mes', name='_conta_saldo_mensal_uc'),
+    )
+
+    def __repr__(self):
+        return f"<ContaSaldoMensal Conta: {self.conta_id} - {self.mes.strftime('%m/%Y')} - R${self.saldo_acumulado}>"
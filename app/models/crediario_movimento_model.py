@@ -1,7 +1,7 @@
 # app/models/crediario_movimento_model.py
 from app import db
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 
 class CrediarioMovimento(db.Model):
     __tablename__ = 'crediario_movimento'
@@ -27,6 +27,9 @@ class CrediarioMovimento(db.Model):
     # Índice único combinado
     __table_args__ = (
         UniqueConstraint('usuario_id', 'crediario_grupo_id', 'crediario_id', 'data_compra', 'descricao', 'valor_total', name='_usuario_crediario_movimento_uc'),
+        # Listagem paginada por cursor e extrato filtrado por crediário
+        Index('ix_crediario_movimento_usuario_data', 'usuario_id', 'data_compra', 'data_criacao', 'id'),
+        Index('ix_crediario_movimento_crediario', 'crediario_id'),
     )
 
     def __repr__(self):
@@ -1,7 +1,7 @@
 # app/models/crediario_parcela_model.py
 from app import db
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 
 class CrediarioParcela(db.Model):
     __tablename__ = 'crediario_parcela'
@@ -20,6 +20,8 @@ class CrediarioParcela(db.Model):
     # Índice único combinado
     __table_args__ = (
         UniqueConstraint('crediario_movimento_id', 'numero_parcela', name='_crediario_movimento_parcela_uc'),
+        # Parcelas do mês (extrato e resumo do dashboard)
+        Index('ix_crediario_parcela_vencimento', 'vencimento', 'crediario_movimento_id'),
     )
 
     def __repr__(self):
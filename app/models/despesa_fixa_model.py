@@ -1,6 +1,6 @@
 # app/models/despesa_fixa_model.py
 from app import db
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 
 class DespesaFixa(db.Model):
     __tablename__ = 'despesa_fixa'
@@ -18,6 +18,8 @@ class DespesaFixa(db.Model):
 
     __table_args__ = (
         UniqueConstraint('usuario_id', 'despesa_receita_id', 'mes_ano', name='_usuario_despesa_fixa_uc'),
+        # Listagem paginada por cursor e despesas do mês no dashboard
+        Index('ix_despesa_fixa_usuario_mes', 'usuario_id', 'mes_ano', 'id'),
     )
 
     def __repr__(self):
@@ -0,0 +1,27 @@
+# app/models/fato_mensal_model.py
+from app import db
+from sqlalchemy.dialects.postgresql import ENUM as PG_ENUM
+from sqlalchemy import UniqueConstraint
+
+origem_fato_enum = PG_ENUM('conta_movimento', 'crediario_parcela', 'financiamento_parcela', 'despesa_fixa', 'renda_movimento',
+                           name='origem_fato', create_type=True)
+
+class FatoMensal(db.Model):
+    __tablename__ = 'fato_mensal'
+
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    mes = db.Column(db.Date, nullable=False) # Primeiro dia do mês de referência
+    origem = db.Column(origem_fato_enum, nullable=False)
+    # Depende da origem: conta_transacao_id, crediario_grupo_id, financiamento_id, despesa_receita_id ou renda_id
+    categoria_id = db.Column(db.Integer, nullable=False)
+    valor_total = db.Column(db.Numeric(14, 2), nullable=False, default=0.00)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+
+    # Índice único combinado (também é o alvo do upsert incremental)
+    __table_args__ = (
+        UniqueConstraint('usuario_id', 'mes', 'origem', 'categoria_id', name='_fato_mensal_uc'),
+    )
+
+    def __repr__(self):
+        return f"<FatoMensal {self.origem} {self.categoria_id} - {self.mes.strftime('%m/%Y')} - R${self.valor_total}>"
@@ -1,7 +1,7 @@
 # app/models/financiamento_parcela_model.py
 from app import db
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import ENUM as PG_ENUM
 
 status_parcela_enum = PG_ENUM('A Pagar', 'Paga', 'Atrasada', 'Amortizada',
@@ -30,6 +30,8 @@ class FinanciamentoParcela(db.Model):
 
     __table_args__ = (
         UniqueConstraint('financiamento_id', 'numero_parcela', name='_financiamento_parcela_uc'),
+        # A restrição acima já indexa (financiamento_id, numero_parcela); este atende às parcelas do mês
+        Index('ix_financiamento_parcela_vencimento', 'financiamento_id', 'data_vencimento'),
     )
 
     def __repr__(self):
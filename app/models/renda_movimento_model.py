@@ -1,7 +1,7 @@
 # app/models/renda_movimento_model.py
 from app import db
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 
 class RendaMovimento(db.Model):
     __tablename__ = 'renda_movimento'
@@ -20,6 +20,9 @@ class RendaMovimento(db.Model):
 
     __table_args__ = (
         UniqueConstraint('usuario_id', 'renda_id', 'mes_ref', 'mes_pagto', name='_usuario_renda_movimento_uc'),
+        # Listagem paginada por cursor e rendas do mês no dashboard
+        Index('ix_renda_movimento_usuario_mes_ref', 'usuario_id', 'mes_ref', 'mes_pagto', 'id'),
+        Index('ix_renda_movimento_usuario_mes_pagto', 'usuario_id', 'mes_pagto'),
     )
 
     def __repr__(self):
@@ -14,6 +14,13 @@ class Usuario(db.Model, UserMixin):
     is_admin = db.Column(db.Boolean, default=False)
     data_criacao = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     default_homepage = db.Column(db.String(50), default='dashboard_bp.dashboard')
+    # Incrementado a cada gravação feita pelo usuário; compõe o ETag das listas (ver app/utils/etag.py)
+    geracao_dados = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        # Busca de login por e-mail sem diferenciar maiúsculas (ver autenticacao_service)
+        db.Index('ix_usuario_email_lower', db.func.lower(email), unique=True),
+    )
 
     def __repr__(self):
         return f"<Usuario {self.login}>"
@@ -23,4 +30,5 @@ class Usuario(db.Model, UserMixin):
 
 @login_manager.user_loader
 def load_user(user_id):
-    return Usuario.query.get(int(user_id))
+    from app.services.usuario_cache_service import carregar_usuario
+    return carregar_usuario(int(user_id))
@@ -4,26 +4,62 @@ from flask_login import login_required, current_user
 from app import db
 from app.models.audit_log_model import AuditLog
 from app.models.usuario_model import Usuario 
+from app.services.audit_sink import audit_sink
+from app.utils.pagination import paginate_keyset_from_request
+from app.utils.query_budget import query_budget
+from datetime import datetime, timedelta
 
 audit_log_bp = Blueprint('audit_log_bp', __name__, template_folder='../templates/audit_logs')
 
+# Tipos de evento gravados pela aplicação (evita um SELECT DISTINCT sobre a tabela inteira)
+TIPOS_EVENTO = ['LOGIN_SUCCESS', 'LOGIN_FAILURE', 'LOGIN_INACTIVE_ACCOUNT', 'LOGOUT']
+
 @audit_log_bp.route('/')
+@query_budget(4)
 @login_required
 def list_audit_logs():
     if not current_user.is_admin:
         flash('Você não tem permissão para acessar o log de auditoria.', 'danger')
         return redirect(url_for('dashboard_bp.dashboard'))
 
-    logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).all()
-    return render_template('audit_logs/list.html', logs=logs)
+    filtros = {
+        'user_id': request.args.get('user_id', ''),
+        'event_type': request.args.get('event_type', ''),
+        'data_inicio': request.args.get('data_inicio', ''),
+        'data_fim': request.args.get('data_fim', '')
+    }
+
+    query = AuditLog.query
+    try:
+        if filtros['user_id']:
+            query = query.filter(AuditLog.user_id == int(filtros['user_id']))
+        if filtros['event_type']:
+            query = query.filter(AuditLog.event_type == filtros['event_type'])
+        if filtros['data_inicio']:
+            query = query.filter(AuditLog.timestamp >= datetime.strptime(filtros['data_inicio'], '%Y-%m-%d'))
+        if filtros['data_fim']:
+            # Data final inclusiva: até o início do dia seguinte
+            query = query.filter(AuditLog.timestamp < datetime.strptime(filtros['data_fim'], '%Y-%m-%d') + timedelta(days=1))
+    except ValueError:
+        flash('Filtros inválidos. Use datas no formato YYYY-MM-DD.', 'danger')
+        return redirect(url_for('audit_log_bp.list_audit_logs'))
+
+    pagina = paginate_keyset_from_request(query, [AuditLog.timestamp, AuditLog.id])
+    usuarios = db.session.query(Usuario.id, Usuario.login).order_by(Usuario.login).all()
+    return render_template('audit_logs/list.html',
+                           logs=pagina.items,
+                           pagina=pagina,
+                           filtros=filtros,
+                           usuarios=usuarios,
+                           tipos_evento=TIPOS_EVENTO)
 
 def log_audit_event(user_id, username, event_type, ip_address=None, user_agent=None):
-    new_log = AuditLog(
-        user_id=user_id,
-        username=username,
-        event_type=event_type,
-        ip_address=ip_address,
-        user_agent=user_agent
-    )
-    db.session.add(new_log)
-    db.session.commit()
+    # Enfileirado para gravação em lote; o horário é o do evento, não o da gravação
+    audit_sink.enqueue({
+        'user_id': user_id,
+        'username': username,
+        'event_type': event_type,
+        'timestamp': datetime.utcnow(),
+        'ip_address': ip_address,
+        'user_agent': user_agent[:255] if user_agent else user_agent
+    })
@@ -3,7 +3,8 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user, login_user
 from app import db, login_manager
 from app.models.usuario_model import Usuario
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.usuario_cache_service import invalidar_usuario
+from app.services.senha_service import gerar_hash, verificar
 from sqlalchemy.exc import IntegrityError
 import re
 
@@ -82,6 +83,7 @@ def update_profile():
         current_user.nome = nome_stripped
         current_user.email = new_email
         db.session.commit()
+        invalidar_usuario(current_user.id)
         flash('Perfil atualizado com sucesso!', 'success')
         login_user(current_user, remember=True)
     except Exception as e:
@@ -105,7 +107,7 @@ def change_password():
         flash('Por favor, preencha todos os campos de senha.', 'danger')
         return redirect(url_for('configuracoes_bp.settings'))
 
-    if not check_password_hash(current_user.senha_hash, current_password):
+    if not verificar(current_user.senha_hash, current_password):
         flash('Senha atual incorreta.', 'danger')
         return redirect(url_for('configuracoes_bp.settings'))
 
@@ -129,8 +131,9 @@ def change_password():
         return redirect(url_for('configuracoes_bp.settings'))
 
     try:
-        current_user.senha_hash = generate_password_hash(new_password)
+        current_user.senha_hash = gerar_hash(new_password)
         db.session.commit()
+        invalidar_usuario(current_user.id)
         flash('Senha alterada com sucesso!', 'success')
         login_user(current_user, remember=True)
     except Exception as e:
@@ -165,6 +168,7 @@ def update_homepage():
     try:
         current_user.default_homepage = new_homepage
         db.session.commit()
+        invalidar_usuario(current_user.id)
         flash('Página inicial padrão atualizada com sucesso!', 'success')
         login_user(current_user, remember=True)
     except Exception as e:
@@ -4,10 +4,17 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.conta_movimento_model import ContaMovimento
-from app.models.conta_model import Conta 
 from app.models.conta_transacao_model import ContaTransacao
+from app.services.saldo_mensal_service import aplicar_movimento, arredondar_centavos, valor_com_sinal
+from app.services.dados_referencia_service import listar_referencias, obter_referencia
+from app.utils.pagination import paginate_keyset_from_request
+from app.utils.query_budget import query_budget
+from app.utils.etag import etag_por_geracao
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from datetime import datetime
+from decimal import InvalidOperation
 
 def standardize_name(name):
     if not name:
@@ -18,16 +25,23 @@ def standardize_name(name):
 conta_movimento_bp = Blueprint('conta_movimento_bp', __name__, template_folder='../templates/conta_movimentos')
 
 @conta_movimento_bp.route('/')
+@query_budget(4)
 @login_required
+@etag_por_geracao
 def list_movimentos():
-    movimentos = ContaMovimento.query.filter_by(usuario_id=current_user.id).order_by(ContaMovimento.data.desc(), ContaMovimento.data_criacao.desc()).all()
-    return render_template('conta_movimentos/list.html', movimentos=movimentos)
+    # Conta e transação são exibidas em cada linha: carregadas no mesmo SELECT
+    query = ContaMovimento.query.filter_by(usuario_id=current_user.id).options(
+        joinedload(ContaMovimento.conta),
+        joinedload(ContaMovimento.conta_transacao_item)
+    )
+    pagina = paginate_keyset_from_request(query, [ContaMovimento.data, ContaMovimento.data_criacao, ContaMovimento.id])
+    return render_template('conta_movimentos/list.html', movimentos=pagina.items, pagina=pagina)
 
 @conta_movimento_bp.route('/add', methods=['GET', 'POST'])
 @login_required
 def add_movimento():
-    contas_disponiveis = Conta.query.filter_by(usuario_id=current_user.id).order_by(Conta.nome_banco, Conta.conta).all()
-    tipos_transacao_disponiveis = ContaTransacao.query.filter_by(usuario_id=current_user.id).order_by(ContaTransacao.transacao).all()
+    contas_disponiveis = listar_referencias('contas', current_user.id)
+    tipos_transacao_disponiveis = listar_referencias('tipos_transacao', current_user.id)
 
     if request.method == 'POST':
         conta_id = request.form.get('conta_id')
@@ -46,8 +60,8 @@ def add_movimento():
             conta_id = int(conta_id)
             transacao_id = int(conta_transacao_id)
             
-            conta_obj = Conta.query.filter_by(id=conta_id, usuario_id=current_user.id).first()
-            transacao_obj = ContaTransacao.query.filter_by(id=transacao_id, usuario_id=current_user.id).first()
+            conta_obj = obter_referencia('contas', current_user.id, conta_id)
+            transacao_obj = obter_referencia('tipos_transacao', current_user.id, transacao_id)
 
             if not conta_obj:
                 flash('Conta bancária inválida selecionada.', 'danger')
@@ -74,13 +88,14 @@ def add_movimento():
                                    tipos_transacao_disponiveis=tipos_transacao_disponiveis)
 
         try:
-            valor = float(valor_str.replace(',', '.'))
+            # Já arredondado como será gravado, para o movimento e o checkpoint usarem o mesmo valor
+            valor = arredondar_centavos(float(valor_str.replace(',', '.')))
             if valor <= 0:
                 flash('Valor deve ser um número positivo (maior que zero).', 'danger')
                 return render_template('conta_movimentos/add.html', 
                                        contas_disponiveis=contas_disponiveis,
                                        tipos_transacao_disponiveis=tipos_transacao_disponiveis)
-        except ValueError:
+        except (ValueError, InvalidOperation):
             flash('Valor deve ser um número válido.', 'danger')
             return render_template('conta_movimentos/add.html', 
                                    contas_disponiveis=contas_disponiveis,
@@ -102,6 +117,10 @@ def add_movimento():
         )
         try:
             db.session.add(new_movimento)
+            # O cache de referências só valida o formulário: o sinal do checkpoint, que fica gravado,
+            # vem do tipo lido no banco, como na edição e na exclusão
+            tipo = db.session.scalar(select(ContaTransacao.tipo).where(ContaTransacao.id == transacao_id))
+            aplicar_movimento(conta_id, data, valor_com_sinal(tipo, valor))
             db.session.commit()
             flash('Movimento bancário adicionado com sucesso!', 'success')
             return redirect(url_for('conta_movimento_bp.list_movimentos'))
@@ -121,22 +140,23 @@ def add_movimento():
 def edit_movimento(movimento_id):
     movimento = ContaMovimento.query.filter_by(id=movimento_id, usuario_id=current_user.id).first_or_404()
     
-    contas_disponiveis = Conta.query.filter_by(usuario_id=current_user.id).order_by(Conta.nome_banco, Conta.conta).all()
-    tipos_transacao_disponiveis = ContaTransacao.query.filter_by(usuario_id=current_user.id).order_by(ContaTransacao.transacao).all()
+    contas_disponiveis = listar_referencias('contas', current_user.id)
+    tipos_transacao_disponiveis = listar_referencias('tipos_transacao', current_user.id)
 
     if request.method == 'POST':
         valor_str = request.form.get('valor')
         descricao = request.form.get('descricao')
+        valor_anterior = movimento.valor
 
         try:
-            valor = float(valor_str.replace(',', '.'))
+            valor = arredondar_centavos(float(valor_str.replace(',', '.')))
             if valor <= 0:
                 flash('Valor deve ser um número positivo (maior que zero).', 'danger')
                 return render_template('conta_movimentos/edit.html', 
                                        movimento=movimento,
                                        contas_disponiveis=contas_disponiveis,
                                        tipos_transacao_disponiveis=tipos_transacao_disponiveis)
-        except ValueError:
+        except (ValueError, InvalidOperation):
             flash('Valor deve ser um número válido.', 'danger')
             return render_template('conta_movimentos/edit.html', 
                                    movimento=movimento,
@@ -155,6 +175,9 @@ def edit_movimento(movimento_id):
         movimento.descricao = descricao
 
         try:
+            tipo = movimento.conta_transacao_item.tipo
+            aplicar_movimento(movimento.conta_id, movimento.data,
+                              valor_com_sinal(tipo, valor) - valor_com_sinal(tipo, valor_anterior))
             db.session.commit()
             flash('Movimento bancário atualizado com sucesso!', 'success')
             return redirect(url_for('conta_movimento_bp.list_movimentos'))
@@ -176,6 +199,8 @@ def delete_movimento(movimento_id):
     movimento = ContaMovimento.query.filter_by(id=movimento_id, usuario_id=current_user.id).first_or_404()
 
     try:
+        aplicar_movimento(movimento.conta_id, movimento.data,
+                          -valor_com_sinal(movimento.conta_transacao_item.tipo, movimento.valor))
         db.session.delete(movimento)
         db.session.commit()
         flash('Movimento bancário excluído com sucesso!', 'success')
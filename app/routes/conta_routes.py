@@ -3,6 +3,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.conta_model import Conta, tipo_conta_enum
+from app.utils.etag import etag_por_geracao
 from sqlalchemy.exc import IntegrityError
 import re
 
@@ -16,6 +17,7 @@ def standardize_name(name):
 
 @conta_bp.route('/')
 @login_required
+@etag_por_geracao
 def list_contas():
     contas = Conta.query.filter_by(usuario_id=current_user.id).order_by(Conta.nome_banco).all()
     return render_template('contas/list.html', contas=contas)
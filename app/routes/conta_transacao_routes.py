@@ -3,6 +3,9 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.conta_transacao_model import ContaTransacao, tipo_natureza_transacao_enum 
+from app.models.conta_movimento_model import ContaMovimento
+from app.services.saldo_mensal_service import reconstruir_saldos_mensais
+from app.utils.etag import etag_por_geracao
 from sqlalchemy.exc import IntegrityError
 import re
 
@@ -16,6 +19,7 @@ conta_transacao_bp = Blueprint('conta_transacao_bp', __name__, template_folder='
 
 @conta_transacao_bp.route('/')
 @login_required
+@etag_por_geracao
 def list_tipos_transacao():
     tipos_transacao = ContaTransacao.query.filter_by(usuario_id=current_user.id).order_by(ContaTransacao.transacao).all()
     return render_template('tipos_transacao/list.html', tipos_transacao=tipos_transacao)
@@ -93,6 +97,7 @@ def edit_tipo_transacao(transacao_id):
             flash('Tipo de natureza de transação inválido selecionado.', 'danger')
             return render_template('tipos_transacao/edit.html', tipo_transacao=tipo_transacao, tipos_natureza=tipos_natureza)
         
+        tipo_alterado = tipo_transacao.tipo != tipo_to_save
         tipo_transacao.tipo = tipo_to_save
 
         if descricao and len(descricao) > 255:
@@ -102,6 +107,12 @@ def edit_tipo_transacao(transacao_id):
         tipo_transacao.descricao = descricao
 
         try:
+            if tipo_alterado:
+                # A natureza inverte o sinal de todos os movimentos desta transação: recalcula os checkpoints afetados
+                conta_ids = [row.conta_id for row in db.session.query(ContaMovimento.conta_id).filter_by(
+                    conta_transacao_id=tipo_transacao.id).distinct()]
+                if conta_ids:
+                    reconstruir_saldos_mensais(conta_ids)
             db.session.commit()
             flash('Tipo de transação atualizado com sucesso!', 'success')
             return redirect(url_for('conta_transacao_bp.list_tipos_transacao'))
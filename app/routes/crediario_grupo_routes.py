@@ -4,6 +4,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.crediario_grupo_model import CrediarioGrupo, tipo_grupo_crediario_enum
+from app.utils.etag import etag_por_geracao
 from sqlalchemy.exc import IntegrityError
 import re
 
@@ -17,6 +18,7 @@ crediario_grupo_bp = Blueprint('crediario_grupo_bp', __name__, template_folder='
 
 @crediario_grupo_bp.route('/')
 @login_required
+@etag_por_geracao
 def list_crediario_grupos():
     grupos = CrediarioGrupo.query.filter_by(usuario_id=current_user.id).order_by(CrediarioGrupo.grupo).all()
     return render_template('crediario_grupos/list.html', grupos=grupos)
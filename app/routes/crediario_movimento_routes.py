@@ -4,10 +4,13 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.crediario_movimento_model import CrediarioMovimento
-from app.models.crediario_model import Crediario
-from app.models.crediario_grupo_model import CrediarioGrupo
-from app.models.crediario_parcela_model import CrediarioParcela
+from app.services.crediario_parcela_service import gerar_parcelas, atualizar_valor_parcelas
+from app.services.dados_referencia_service import listar_referencias, obter_referencia
+from app.utils.pagination import paginate_keyset_from_request
+from app.utils.query_budget import query_budget
+from app.utils.etag import etag_por_geracao
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
@@ -20,16 +23,23 @@ def standardize_name(name):
 crediario_movimento_bp = Blueprint('crediario_movimento_bp', __name__, template_folder='../templates/crediario_movimentos')
 
 @crediario_movimento_bp.route('/')
+@query_budget(4)
 @login_required
+@etag_por_geracao
 def list_movimentos_crediario():
-    movimentos = CrediarioMovimento.query.filter_by(usuario_id=current_user.id).order_by(CrediarioMovimento.data_compra.desc(), CrediarioMovimento.data_criacao.desc()).all()
-    return render_template('crediario_movimentos/list.html', movimentos=movimentos)
+    # Crediário e grupo são exibidos em cada linha: carregados no mesmo SELECT
+    query = CrediarioMovimento.query.filter_by(usuario_id=current_user.id).options(
+        joinedload(CrediarioMovimento.crediario),
+        joinedload(CrediarioMovimento.crediario_grupo)
+    )
+    pagina = paginate_keyset_from_request(query, [CrediarioMovimento.data_compra, CrediarioMovimento.data_criacao, CrediarioMovimento.id])
+    return render_template('crediario_movimentos/list.html', movimentos=pagina.items, pagina=pagina)
 
 @crediario_movimento_bp.route('/add', methods=['GET', 'POST'])
 @login_required
 def add_movimento_crediario():
-    crediarios_disponiveis = Crediario.query.filter_by(usuario_id=current_user.id).order_by(Crediario.crediario).all()
-    grupos_disponiveis = CrediarioGrupo.query.filter_by(usuario_id=current_user.id).order_by(CrediarioGrupo.grupo).all()
+    crediarios_disponiveis = listar_referencias('crediarios', current_user.id)
+    grupos_disponiveis = listar_referencias('crediario_grupos', current_user.id)
 
     if request.method == 'POST':
         crediario_id = request.form.get('crediario_id')
@@ -50,8 +60,8 @@ def add_movimento_crediario():
             crediario_id = int(crediario_id)
             crediario_grupo_id = int(crediario_grupo_id)
             
-            crediario_obj = Crediario.query.filter_by(id=crediario_id, usuario_id=current_user.id).first()
-            grupo_obj = CrediarioGrupo.query.filter_by(id=crediario_grupo_id, usuario_id=current_user.id).first()
+            crediario_obj = obter_referencia('crediarios', current_user.id, crediario_id)
+            grupo_obj = obter_referencia('crediario_grupos', current_user.id, crediario_grupo_id)
 
             if not crediario_obj:
                 flash('Crediário inválido selecionado.', 'danger')
@@ -123,19 +133,11 @@ def add_movimento_crediario():
         )
         try:
             db.session.add(new_movimento)
-            db.session.commit()
+            db.session.flush() # Obtém o id da compra sem encerrar a transação
 
-            if new_movimento.num_parcelas > 0:
-                for i in range(new_movimento.num_parcelas):
-                    vencimento_parcela = new_movimento.primeira_parcela + relativedelta(months=i)
-                    parcela = CrediarioParcela(
-                        crediario_movimento_id=new_movimento.id,
-                        numero_parcela=i + 1,
-                        vencimento=vencimento_parcela,
-                        valor_parcela=new_movimento.valor_parcela_mensal
-                    )
-                    db.session.add(parcela)
-                db.session.commit()
+            # Compra e parcelas são gravadas juntas: ou tudo, ou nada
+            gerar_parcelas(new_movimento)
+            db.session.commit()
 
             flash('Movimentação de Crediário adicionada com sucesso!', 'success')
             return redirect(url_for('crediario_movimento_bp.list_movimentos_crediario'))
@@ -155,8 +157,8 @@ def add_movimento_crediario():
 def edit_movimento_crediario(movimento_id):
     movimento = CrediarioMovimento.query.filter_by(id=movimento_id, usuario_id=current_user.id).first_or_404()
     
-    crediarios_disponiveis = Crediario.query.filter_by(usuario_id=current_user.id).order_by(Crediario.crediario).all()
-    grupos_disponiveis = CrediarioGrupo.query.filter_by(usuario_id=current_user.id).order_by(CrediarioGrupo.grupo).all()
+    crediarios_disponiveis = listar_referencias('crediarios', current_user.id)
+    grupos_disponiveis = listar_referencias('crediario_grupos', current_user.id)
 
     if request.method == 'POST':
         descricao = request.form.get('descricao')
@@ -177,15 +179,14 @@ def edit_movimento_crediario(movimento_id):
                                    crediarios_disponiveis=crediarios_disponiveis,
                                    grupos_disponiveis=grupos_disponiveis)
         
-        if movimento.valor_total != valor_total:
-            movimento.valor_total = valor_total
-            movimento.valor_parcela_mensal = round(movimento.valor_total / movimento.num_parcelas, 2)
-            for parcela in movimento.parcelas:
-                parcela.valor_parcela = movimento.valor_parcela_mensal
-        
-        movimento.descricao = descricao
-
         try:
+            # Compra e parcelas são atualizadas juntas: ou tudo, ou nada
+            if movimento.valor_total != valor_total:
+                movimento.valor_total = valor_total
+                movimento.valor_parcela_mensal = round(movimento.valor_total / movimento.num_parcelas, 2)
+                atualizar_valor_parcelas(movimento)
+
+            movimento.descricao = descricao
             db.session.commit()
             flash('Movimentação de Crediário atualizada com sucesso!', 'success')
             return redirect(url_for('crediario_movimento_bp.list_movimentos_crediario'))
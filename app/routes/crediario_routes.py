@@ -3,6 +3,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.crediario_model import Crediario, tipo_crediario_enum
+from app.utils.etag import etag_por_geracao
 from sqlalchemy.exc import IntegrityError
 import re
 
@@ -16,6 +17,7 @@ crediario_bp = Blueprint('crediario_bp', __name__, template_folder='../templates
 
 @crediario_bp.route('/')
 @login_required
+@etag_por_geracao
 def list_crediarios():
     crediarios = Crediario.query.filter_by(usuario_id=current_user.id).order_by(Crediario.crediario).all()
     return render_template('crediarios/list.html', crediarios=crediarios)
@@ -1,10 +1,17 @@
 # app/routes/dashboard_routes.py
 from flask import Blueprint, render_template
 from flask_login import login_required, current_user
+from app.services.dashboard_service import resumo_do_mes
+from app.utils.query_budget import query_budget
+from datetime import date
+from dateutil.relativedelta import relativedelta
 
 dashboard_bp = Blueprint('dashboard_bp', __name__, template_folder='../templates')
 
 @dashboard_bp.route('/')
+@query_budget(2)
 @login_required
 def dashboard():
-    return render_template('dashboard.html')
+    mes = date.today().replace(day=1)
+    resumo = resumo_do_mes(current_user.id, mes, mes + relativedelta(months=1))
+    return render_template('dashboard.html', resumo=resumo, mes_ano=mes)
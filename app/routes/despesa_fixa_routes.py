@@ -4,8 +4,12 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.despesa_fixa_model import DespesaFixa
-from app.models.despesa_receita_model import DespesaReceita # Para selecionar o item de despesa/receita
+from app.services.dados_referencia_service import listar_referencias, obter_referencia
+from app.utils.pagination import paginate_keyset_from_request
+from app.utils.query_budget import query_budget
+from app.utils.etag import etag_por_geracao
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 
 def standardize_name(name):
@@ -17,17 +21,20 @@ def standardize_name(name):
 despesa_fixa_bp = Blueprint('despesa_fixa_bp', __name__, template_folder='../templates/despesas_fixas')
 
 @despesa_fixa_bp.route('/')
+@query_budget(4)
 @login_required
+@etag_por_geracao
 def list_despesas_fixas():
-    despesas_fixas = DespesaFixa.query.filter_by(usuario_id=current_user.id).order_by(DespesaFixa.mes_ano.desc()).all()
-    return render_template('despesas_fixas/list.html', despesas_fixas=despesas_fixas)
+    query = DespesaFixa.query.filter_by(usuario_id=current_user.id).options(
+        joinedload(DespesaFixa.despesa_receita_item)
+    )
+    pagina = paginate_keyset_from_request(query, [DespesaFixa.mes_ano, DespesaFixa.id])
+    return render_template('despesas_fixas/list.html', despesas_fixas=pagina.items, pagina=pagina)
 
 @despesa_fixa_bp.route('/add', methods=['GET', 'POST'])
 @login_required
 def add_despesa_fixa():
-    despesas_receitas_disponiveis = DespesaReceita.query.filter_by(
-        usuario_id=current_user.id, tipo='Despesa'
-    ).order_by(DespesaReceita.despesa_receita).all()
+    despesas_receitas_disponiveis = listar_referencias('despesas_receitas', current_user.id, tipo='Despesa')
 
     if request.method == 'POST':
         despesa_receita_id = request.form.get('despesa_receita_id')
@@ -41,9 +48,7 @@ def add_despesa_fixa():
 
         try:
             despesa_receita_id = int(despesa_receita_id)
-            item_despesa_receita = DespesaReceita.query.filter_by(
-                id=despesa_receita_id, usuario_id=current_user.id, tipo='Despesa'
-            ).first()
+            item_despesa_receita = obter_referencia('despesas_receitas', current_user.id, despesa_receita_id, tipo='Despesa')
             if not item_despesa_receita:
                 flash('Item de Despesa/Receita inválido selecionado.', 'danger')
                 return render_template('despesas_fixas/add.html', despesas_receitas_disponiveis=despesas_receitas_disponiveis)
@@ -96,9 +101,7 @@ def add_despesa_fixa():
 def edit_despesa_fixa(despesa_fixa_id):
     despesa_fixa = DespesaFixa.query.filter_by(id=despesa_fixa_id, usuario_id=current_user.id).first_or_404()
     
-    despesas_receitas_disponiveis = DespesaReceita.query.filter_by(
-        usuario_id=current_user.id, tipo='Despesa'
-    ).order_by(DespesaReceita.despesa_receita).all()
+    despesas_receitas_disponiveis = listar_referencias('despesas_receitas', current_user.id, tipo='Despesa')
 
     if request.method == 'POST':
         valor_str = request.form.get('valor')
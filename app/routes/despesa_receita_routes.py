@@ -3,6 +3,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.despesa_receita_model import DespesaReceita, tipo_despesa_receita_enum
+from app.utils.etag import etag_por_geracao
 from sqlalchemy.exc import IntegrityError
 import re
 
@@ -16,6 +17,7 @@ despesa_receita_bp = Blueprint('despesa_receita_bp', __name__, template_folder='
 
 @despesa_receita_bp.route('/')
 @login_required
+@etag_por_geracao
 def list_despesas_receitas():
     items = DespesaReceita.query.filter_by(usuario_id=current_user.id).order_by(DespesaReceita.despesa_receita).all()
     return render_template('despesas_receitas/list.html', items=items)
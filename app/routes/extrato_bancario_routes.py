@@ -3,11 +3,9 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.conta_model import Conta
-from app.models.conta_movimento_model import ContaMovimento
-from app.models.conta_transacao_model import ContaTransacao
+from app.services.extrato_bancario_service import extrato_do_mes
+from app.utils.query_budget import query_budget
 from datetime import datetime
-from sqlalchemy import func
-from decimal import Decimal # <--- IMPORTAR DECIMAL
 
 extrato_bancario_bp = Blueprint('extrato_bancario_bp', __name__, template_folder='../templates/extratos_bancarios')
 
@@ -20,6 +18,7 @@ def selecionar_extrato():
 
 # --- Rota para Exibir o Extrato Bancário ---
 @extrato_bancario_bp.route('/exibir', methods=['POST'])
+@query_budget(4)
 @login_required
 def exibir_extrato():
     conta_id = request.form.get('conta_id')
@@ -46,45 +45,8 @@ def exibir_extrato():
         flash('Conta não encontrada ou você não tem permissão para acessá-la.', 'danger')
         return redirect(url_for('extrato_bancario_bp.selecionar_extrato'))
 
-    # 1. Calcular Saldo Inicial do Mês
-    # Começa com o saldo inicial da conta (que já é Decimal)
-    saldo_inicial_calculado = conta.saldo_inicial 
-
-    # Soma/subtrai movimentos ANTES do mês selecionado para esta conta
-    movimentos_anteriores = ContaMovimento.query.join(
-        ContaTransacao, ContaMovimento.conta_transacao_id == ContaTransacao.id
-    ).filter(
-        ContaMovimento.conta_id == conta.id,
-        ContaMovimento.data < mes_ano_dt
-    ).all()
-
-    for mov in movimentos_anteriores:
-        # Garante que a operação seja entre Decimais
-        if mov.conta_transacao_item.tipo == 'Crédito':
-            saldo_inicial_calculado += mov.valor # mov.valor já é Decimal
-        elif mov.conta_transacao_item.tipo == 'Débito':
-            saldo_inicial_calculado -= mov.valor # mov.valor já é Decimal
-    
-    saldo_inicial = saldo_inicial_calculado
-
-
-    # 2. Obter Movimentações do Mês Selecionado
-    movimentos_do_mes = ContaMovimento.query.join(
-        ContaTransacao, ContaMovimento.conta_transacao_id == ContaTransacao.id
-    ).filter(
-        ContaMovimento.conta_id == conta.id,
-        ContaMovimento.data >= mes_ano_dt,
-        ContaMovimento.data < proximo_mes_dt
-    ).order_by(ContaMovimento.data, ContaMovimento.data_criacao).all()
-
-    # 3. Calcular Saldo Final do Mês
-    saldo_final = saldo_inicial # saldo_inicial já é Decimal
-    for mov in movimentos_do_mes:
-        # Garante que a operação seja entre Decimais
-        if mov.conta_transacao_item.tipo == 'Crédito':
-            saldo_final += mov.valor # mov.valor já é Decimal
-        elif mov.conta_transacao_item.tipo == 'Débito':
-            saldo_final -= mov.valor # mov.valor já é Decimal
+    # Saldo inicial, movimentações do mês com saldo corrente e saldo final, calculados no banco
+    saldo_inicial, movimentos_do_mes, saldo_final = extrato_do_mes(conta, mes_ano_dt, proximo_mes_dt)
 
     return render_template('extratos_bancarios/extrato.html',
                            conta=conta,
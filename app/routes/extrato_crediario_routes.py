@@ -3,11 +3,9 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.crediario_model import Crediario
-from app.models.crediario_movimento_model import CrediarioMovimento
-from app.models.crediario_parcela_model import CrediarioParcela
+from app.services.extrato_crediario_service import extrato_crediario_do_mes
+from app.utils.query_budget import query_budget
 from datetime import datetime
-from sqlalchemy import and_
-from decimal import Decimal 
 
 extrato_crediario_bp = Blueprint('extrato_crediario_bp', __name__, template_folder='../templates/extratos_crediarios')
 
@@ -18,6 +16,7 @@ def selecionar_extrato_crediario():
     return render_template('extratos_crediarios/selecionar.html', crediarios_disponiveis=crediarios_disponiveis)
 
 @extrato_crediario_bp.route('/exibir', methods=['POST'])
+@query_budget(4)
 @login_required
 def exibir_extrato_crediario():
     crediario_id = request.form.get('crediario_id')
@@ -38,16 +37,6 @@ def exibir_extrato_crediario():
         flash('Mês/Ano inválido. Use o formato YYYY-MM.', 'danger')
         return redirect(url_for('extrato_crediario_bp.selecionar_extrato_crediario'))
 
-    query = CrediarioParcela.query.join(
-        CrediarioMovimento, CrediarioParcela.crediario_movimento_id == CrediarioMovimento.id
-    ).join(
-        Crediario, CrediarioMovimento.crediario_id == Crediario.id
-    ).filter(
-        Crediario.usuario_id == current_user.id,
-        CrediarioParcela.vencimento >= mes_ano_dt,
-        CrediarioParcela.vencimento < proximo_mes_dt
-    )
-
     crediario_selecionado = None
     if crediario_id and crediario_id != 'all':
         try:
@@ -56,16 +45,14 @@ def exibir_extrato_crediario():
             if not crediario_selecionado:
                 flash('Crediário não encontrado ou você não tem permissão para acessá-lo.', 'danger')
                 return redirect(url_for('extrato_crediario_bp.selecionar_extrato_crediario'))
-            query = query.filter(Crediario.id == crediario_id)
         except ValueError:
             flash('ID de Crediário inválido.', 'danger')
             return redirect(url_for('extrato_crediario_bp.selecionar_extrato_crediario'))
-    
-    parcelas_do_mes = query.order_by(CrediarioParcela.vencimento, CrediarioParcela.numero_parcela).all() 
+    else:
+        crediario_id = 'all'
 
-    total_parcelas = Decimal('0.00')
-    for parcela in parcelas_do_mes:
-        total_parcelas += parcela.valor_parcela 
+    # Linhas planas com crediário, grupo e compra de cada parcela, vindas do cache quando possível
+    parcelas_do_mes, total_parcelas = extrato_crediario_do_mes(current_user.id, crediario_id, mes_ano_dt, proximo_mes_dt)
 
     return render_template('extratos_crediarios/extrato.html',
                            mes_ano=mes_ano_dt,
@@ -3,13 +3,16 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.financiamento_model import Financiamento, tipo_amortizacao_enum
-from app.models.conta_model import Conta # Para selecionar a conta
 from app.models.financiamento_parcela_model import FinanciamentoParcela, status_parcela_enum # Para importar parcelas
+from app.services.amortizacao_service import TIPOS_SUPORTADOS, gerar_parcelas_financiamento, parcelas_com_pagamento
+from app.services.importacao_parcelas_service import CABECALHO_OBRIGATORIO, abrir_csv, importar_parcelas
+from app.services.dados_referencia_service import listar_referencias, obter_referencia
+from app.utils.query_budget import query_budget
+from app.utils.etag import etag_por_geracao
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 import re
-import csv # Para ler arquivos CSV
-from io import StringIO # Para lidar com o conteúdo do arquivo em memória
 
 # Função auxiliar para padronizar nomes (remover especiais, espaços extras, maiúsculas)
 def standardize_name(name):
@@ -25,17 +28,21 @@ financiamento_bp = Blueprint('financiamento_bp', __name__, template_folder='../t
 
 # --- Rota para Listar Financiamentos ---
 @financiamento_bp.route('/')
+@query_budget(4)
 @login_required
+@etag_por_geracao
 def list_financiamentos():
     # Apenas listar os financiamentos do usuário logado
-    financiamentos = Financiamento.query.filter_by(usuario_id=current_user.id).order_by(Financiamento.data_criacao.desc()).all()
+    financiamentos = Financiamento.query.filter_by(usuario_id=current_user.id).options(
+        joinedload(Financiamento.conta) # Conta exibida em cada linha
+    ).order_by(Financiamento.data_criacao.desc()).all()
     return render_template('financiamentos/list.html', financiamentos=financiamentos)
 
 # --- Rota para Adicionar Novo Financiamento ---
 @financiamento_bp.route('/add', methods=['GET', 'POST'])
 @login_required
 def add_financiamento():
-    contas_disponiveis = Conta.query.filter_by(usuario_id=current_user.id).order_by(Conta.nome_banco, Conta.conta).all()
+    contas_disponiveis = listar_referencias('contas', current_user.id)
     tipos_amortizacao = tipo_amortizacao_enum.enums
 
     if request.method == 'POST':
@@ -48,6 +55,7 @@ def add_financiamento():
         prazo_meses_str = request.form.get('prazo_meses')
         tipo_amortizacao_from_form = request.form.get('tipo_amortizacao')
         descricao = request.form.get('descricao')
+        gerar_parcelas = request.form.get('gerar_parcelas') == 'on'
 
         # --- Validações ---
         if not (conta_id and nome_financiamento and valor_total_financiado_str and 
@@ -60,7 +68,7 @@ def add_financiamento():
         # 1. Validação do ID da Conta
         try:
             conta_id = int(conta_id)
-            conta_obj = Conta.query.filter_by(id=conta_id, usuario_id=current_user.id).first()
+            conta_obj = obter_referencia('contas', current_user.id, conta_id)
             if not conta_obj:
                 flash('Conta bancária inválida selecionada.', 'danger')
                 return render_template('financiamentos/add.html', 
@@ -139,6 +147,12 @@ def add_financiamento():
                                    contas_disponiveis=contas_disponiveis,
                                    tipos_amortizacao=tipos_amortizacao)
         
+        if gerar_parcelas and tipo_amortizacao_to_save not in TIPOS_SUPORTADOS:
+            flash('A geração automática de parcelas está disponível apenas para SAC e PRICE.', 'danger')
+            return render_template('financiamentos/add.html', 
+                                   contas_disponiveis=contas_disponiveis,
+                                   tipos_amortizacao=tipos_amortizacao)
+        
         # 6. Validação de Descrição (tamanho máximo)
         if descricao and len(descricao) > 255:
             flash('A descrição não pode ter mais de 255 caracteres.', 'danger')
@@ -160,8 +174,14 @@ def add_financiamento():
         )
         try:
             db.session.add(new_financiamento)
+            if gerar_parcelas:
+                db.session.flush() # Obtém o id para gravar as parcelas na mesma transação
+                total_parcelas = gerar_parcelas_financiamento(new_financiamento)
             db.session.commit()
-            flash('Financiamento adicionado com sucesso! Agora você pode importar as parcelas via CSV.', 'success')
+            if gerar_parcelas:
+                flash(f'Financiamento adicionado com sucesso! {total_parcelas} parcelas foram geradas pela tabela {new_financiamento.tipo_amortizacao}.', 'success')
+            else:
+                flash('Financiamento adicionado com sucesso! Agora você pode importar as parcelas via CSV.', 'success')
             return redirect(url_for('financiamento_bp.list_financiamentos'))
         except IntegrityError:
             db.session.rollback()
@@ -180,7 +200,7 @@ def add_financiamento():
 def edit_financiamento(financiamento_id):
     financiamento = Financiamento.query.filter_by(id=financiamento_id, usuario_id=current_user.id).first_or_404()
     
-    contas_disponiveis = Conta.query.filter_by(usuario_id=current_user.id).order_by(Conta.nome_banco, Conta.conta).all()
+    contas_disponiveis = listar_referencias('contas', current_user.id)
     tipos_amortizacao = tipo_amortizacao_enum.enums
 
     if request.method == 'POST':
@@ -252,84 +272,19 @@ def importar_parcelas_financiamento_csv(financiamento_id):
             flash('Formato de arquivo inválido. Por favor, envie um arquivo CSV.', 'danger')
             return redirect(request.url)
         
-        stream = StringIO(file.stream.read().decode("UTF8"))
-        csv_reader = csv.reader(stream)
-        header = next(csv_reader) # Pula o cabeçalho
+        csv_reader = abrir_csv(file)
+        try:
+            header = next(csv_reader) # Pula o cabeçalho
+        except (StopIteration, UnicodeDecodeError):
+            header = []
 
-        required_headers = ['numero_parcela', 'data_vencimento', 'valor_principal', 'valor_juros', 'valor_seguro', 'valor_taxas', 'valor_total_previsto']
-        if not all(h in header for h in required_headers):
-            flash(f'Cabeçalho CSV inválido. As colunas obrigatórias são: {", ".join(required_headers)}.', 'danger')
+        if not all(h in header for h in CABECALHO_OBRIGATORIO):
+            flash(f'Cabeçalho CSV inválido. As colunas obrigatórias são: {", ".join(CABECALHO_OBRIGATORIO)}.', 'danger')
             return render_template('financiamentos/importar_parcelas_csv.html', financiamento=financiamento)
 
-        imported_count = 0
-        errors = []
-
-        for i, row in enumerate(csv_reader):
-            row_dict = dict(zip(header, row))
-            
-            try:
-                numero_parcela = int(row_dict['numero_parcela'])
-                data_vencimento_str = row_dict['data_vencimento']
-                valor_principal_str = row_dict['valor_principal']
-                valor_juros_str = row_dict['valor_juros']
-                valor_seguro_str = row_dict.get('valor_seguro', '0.00') # Opcional
-                valor_taxas_str = row_dict.get('valor_taxas', '0.00') # Opcional
-                valor_total_previsto_str = row_dict['valor_total_previsto']
-
-                # Validação de datas
-                try:
-                    data_vencimento = datetime.strptime(data_vencimento_str, '%Y-%m-%d').date()
-                except ValueError:
-                    errors.append(f"Linha {i+2}: Formato de Data de Vencimento inválido '{data_vencimento_str}'. Use YYYY-MM-DD.")
-                    continue
-
-                # Validação de valores numéricos
-                try:
-                    valor_principal = float(valor_principal_str.replace(',', '.'))
-                    valor_juros = float(valor_juros_str.replace(',', '.'))
-                    valor_seguro = float(valor_seguro_str.replace(',', '.'))
-                    valor_taxas = float(valor_taxas_str.replace(',', '.'))
-                    valor_total_previsto = float(valor_total_previsto_str.replace(',', '.'))
-
-                    if valor_principal < 0 or valor_juros < 0 or valor_seguro < 0 or valor_taxas < 0 or valor_total_previsto <= 0:
-                        errors.append(f"Linha {i+2}: Valores numéricos devem ser positivos e Valor Total Previsto maior que zero.")
-                        continue
-                except ValueError:
-                    errors.append(f"Linha {i+2}: Valores numéricos inválidos.")
-                    continue
-                
-                # Verifica se a parcela já existe (para evitar duplicatas em re-importações)
-                existing_parcela = FinanciamentoParcela.query.filter_by(
-                    financiamento_id=financiamento.id,
-                    numero_parcela=numero_parcela
-                ).first()
-
-                if existing_parcela:
-                    # Se a parcela já existe, pode-se optar por atualizar ou pular
-                    # Por simplicidade, vamos pular e registrar um erro/aviso
-                    errors.append(f"Linha {i+2}: Parcela {numero_parcela} para este financiamento já existe. Pulando.")
-                    continue
-
-                new_parcela = FinanciamentoParcela(
-                    financiamento_id=financiamento.id,
-                    numero_parcela=numero_parcela,
-                    data_vencimento=data_vencimento,
-                    valor_principal=valor_principal,
-                    valor_juros=valor_juros,
-                    valor_seguro=valor_seguro,
-                    valor_taxas=valor_taxas,
-                    valor_total_previsto=valor_total_previsto,
-                    status='A Pagar' # Status inicial ao importar
-                )
-                db.session.add(new_parcela)
-                imported_count += 1
-
-            except Exception as e:
-                errors.append(f"Linha {i+2}: Erro ao processar: {e}")
-                db.session.rollback()
-                continue
-        
         try:
+            # Parcelas válidas são gravadas em lotes; o commit confirma a importação inteira
+            imported_count, errors = importar_parcelas(financiamento, header, csv_reader)
             db.session.commit()
             if imported_count > 0:
                 flash(f'{imported_count} parcelas importadas com sucesso para o financiamento "{financiamento.nome_financiamento}"!', 'success')
@@ -346,9 +301,35 @@ def importar_parcelas_financiamento_csv(financiamento_id):
 
     return render_template('financiamentos/importar_parcelas_csv.html', financiamento=financiamento)
 
+# --- Rota para Gerar (ou Regerar) as Parcelas pela Tabela SAC/PRICE ---
+@financiamento_bp.route('/<int:financiamento_id>/gerar_parcelas', methods=['POST'])
+@login_required
+def gerar_parcelas_tabela(financiamento_id):
+    financiamento = Financiamento.query.filter_by(id=financiamento_id, usuario_id=current_user.id).first_or_404()
+
+    if financiamento.tipo_amortizacao not in TIPOS_SUPORTADOS:
+        flash('A geração automática de parcelas está disponível apenas para SAC e PRICE.', 'danger')
+        return redirect(url_for('financiamento_bp.list_parcelas_financiamento', financiamento_id=financiamento.id))
+
+    if parcelas_com_pagamento(financiamento):
+        flash('Não é possível regerar as parcelas: existem parcelas pagas ou amortizadas.', 'danger')
+        return redirect(url_for('financiamento_bp.list_parcelas_financiamento', financiamento_id=financiamento.id))
+
+    try:
+        total_parcelas = gerar_parcelas_financiamento(financiamento)
+        db.session.commit()
+        flash(f'{total_parcelas} parcelas geradas pela tabela {financiamento.tipo_amortizacao}.', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Erro ao gerar parcelas: {e}', 'danger')
+
+    return redirect(url_for('financiamento_bp.list_parcelas_financiamento', financiamento_id=financiamento.id))
+
 # --- Rota para Listar Parcelas de um Financiamento ---
 @financiamento_bp.route('/<int:financiamento_id>/parcelas')
+@query_budget(4)
 @login_required
+@etag_por_geracao
 def list_parcelas_financiamento(financiamento_id):
     financiamento = Financiamento.query.filter_by(id=financiamento_id, usuario_id=current_user.id).first_or_404()
     parcelas = FinanciamentoParcela.query.filter_by(financiamento_id=financiamento.id).order_by(FinanciamentoParcela.numero_parcela).all()
@@ -3,8 +3,12 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.renda_movimento_model import RendaMovimento
-from app.models.renda_model import Renda
+from app.services.dados_referencia_service import listar_referencias, obter_referencia
+from app.utils.pagination import paginate_keyset_from_request
+from app.utils.query_budget import query_budget
+from app.utils.etag import etag_por_geracao
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 import re
 
@@ -17,15 +21,20 @@ def standardize_name(name):
 renda_movimento_bp = Blueprint('renda_movimento_bp', __name__, template_folder='../templates/renda_movimentos')
 
 @renda_movimento_bp.route('/')
+@query_budget(4)
 @login_required
+@etag_por_geracao
 def list_renda_movimentos():
-    movimentos = RendaMovimento.query.filter_by(usuario_id=current_user.id).order_by(RendaMovimento.mes_ref.desc(), RendaMovimento.mes_pagto.desc()).all()
-    return render_template('renda_movimentos/list.html', movimentos=movimentos)
+    query = RendaMovimento.query.filter_by(usuario_id=current_user.id).options(
+        joinedload(RendaMovimento.renda_item)
+    )
+    pagina = paginate_keyset_from_request(query, [RendaMovimento.mes_ref, RendaMovimento.mes_pagto, RendaMovimento.id])
+    return render_template('renda_movimentos/list.html', movimentos=pagina.items, pagina=pagina)
 
 @renda_movimento_bp.route('/add', methods=['GET', 'POST'])
 @login_required
 def add_renda_movimento():
-    rendas_disponiveis = Renda.query.filter_by(usuario_id=current_user.id).order_by(Renda.descricao).all()
+    rendas_disponiveis = listar_referencias('rendas', current_user.id)
 
     if request.method == 'POST':
         renda_id = request.form.get('renda_id')
@@ -40,7 +49,7 @@ def add_renda_movimento():
 
         try:
             renda_id = int(renda_id)
-            renda_obj = Renda.query.filter_by(id=renda_id, usuario_id=current_user.id).first()
+            renda_obj = obter_referencia('rendas', current_user.id, renda_id)
             if not renda_obj:
                 flash('Item de Renda inválido selecionado.', 'danger')
                 return render_template('renda_movimentos/add.html', rendas_disponiveis=rendas_disponiveis)
@@ -95,7 +104,7 @@ def add_renda_movimento():
 def edit_renda_movimento(movimento_id): 
     movimento = RendaMovimento.query.filter_by(id=movimento_id, usuario_id=current_user.id).first_or_404()
     
-    rendas_disponiveis = Renda.query.filter_by(usuario_id=current_user.id).order_by(Renda.descricao).all()
+    rendas_disponiveis = listar_referencias('rendas', current_user.id)
 
     if request.method == 'POST':
         valor_str = request.form.get('valor')
@@ -3,6 +3,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app import db
 from app.models.renda_model import Renda, tipo_renda_enum
+from app.utils.etag import etag_por_geracao
 from sqlalchemy.exc import IntegrityError
 import re
 
@@ -16,6 +17,7 @@ renda_bp = Blueprint('renda_bp', __name__, template_folder='../templates/rendas'
 
 @renda_bp.route('/')
 @login_required
+@etag_por_geracao
 def list_rendas():
     rendas = Renda.query.filter_by(usuario_id=current_user.id).order_by(Renda.descricao).all()
     return render_template('rendas/list.html', rendas=rendas)
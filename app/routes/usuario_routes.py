@@ -1,11 +1,14 @@
 # app/routes/usuario_routes.py
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from app.models.usuario_model import Usuario, db
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import login_user, logout_user, login_required, current_user
 import re
 from sqlalchemy.exc import IntegrityError
 from app.routes.audit_log_routes import log_audit_event
+from app.services.usuario_cache_service import invalidar_usuario
+from app.services.autenticacao_service import buscar_usuario_para_login
+from app.services.limitador_login import limitador_login
+from app.services.senha_service import gerar_hash, verificar, precisa_rehash
 
 usuario_bp = Blueprint('usuario_bp', __name__, template_folder='../templates/usuarios')
 
@@ -17,14 +20,26 @@ def login():
     if request.method == 'POST':
         login_id = request.form.get('login_id')
         senha = request.form.get('senha')
-
-        user = Usuario.query.filter((Usuario.login == login_id) | (Usuario.email == login_id)).first()
-
         ip_address = request.remote_addr
         user_agent = request.headers.get('User-Agent')
 
-        if user and check_password_hash(user.senha_hash, senha):
+        # Recusa antes de consultar o banco ou calcular o hash da senha
+        if not limitador_login.permitir(ip_address, login_id):
+            flash('Muitas tentativas de login. Aguarde alguns instantes e tente novamente.', 'danger')
+            return render_template('login.html'), 429
+
+        user = buscar_usuario_para_login(login_id)
+
+        if user and verificar(user.senha_hash, senha):
             if user.is_active:
+                if precisa_rehash(user.senha_hash):
+                    # Hash gravado com parâmetros antigos: refaz com a política atual aproveitando a senha em texto puro
+                    try:
+                        user.senha_hash = gerar_hash(senha)
+                        db.session.commit()
+                        invalidar_usuario(user.id)
+                    except Exception:
+                        db.session.rollback()
                 login_user(user, remember=True)
                 flash('Login bem-sucedido!', 'success')
                 log_audit_event(user.id, user.login, 'LOGIN_SUCCESS', ip_address, user_agent)
@@ -39,6 +54,7 @@ def login():
                 log_audit_event(user.id, user.login, 'LOGIN_INACTIVE_ACCOUNT', ip_address, user_agent)
         else:
             flash('Login ou senha inválidos.', 'danger')
+            limitador_login.registrar_falha(ip_address, login_id)
             log_audit_event(None, login_id, 'LOGIN_FAILURE', ip_address, user_agent)
     return render_template('login.html')
 
@@ -153,7 +169,7 @@ def add_user():
             flash('Este login já está em uso.', 'danger')
             return render_template('add.html')
 
-        senha_hash = generate_password_hash(senha)
+        senha_hash = gerar_hash(senha)
         new_user = Usuario(
             nome=nome,
             email=email,
@@ -251,10 +267,11 @@ def edit_user(user_id):
                 flash('Esta senha é muito comum. Por favor, escolha uma senha mais forte.', 'danger')
                 return render_template('edit.html', user=user)
 
-            user.senha_hash = generate_password_hash(nova_senha)
+            user.senha_hash = gerar_hash(nova_senha)
 
         try:
             db.session.commit()
+            invalidar_usuario(user.id)
             flash('Usuário atualizado com sucesso!', 'success')
             return redirect(url_for('usuario_bp.list_users'))
         except Exception as e:
@@ -279,6 +296,7 @@ def delete_user(user_id):
     try:
         db.session.delete(user)
         db.session.commit()
+        invalidar_usuario(user_id)
         flash('Usuário excluído com sucesso!', 'success')
     except IntegrityError as e:
         db.session.rollback()
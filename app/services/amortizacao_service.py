@@ -0,0 +1,89 @@
+# app/services/amortizacao_service.py
+from app import db
+from app.models.financiamento_parcela_model import FinanciamentoParcela
+from app.services.importacao_parcelas_service import gravar_lote
+from app.services.fato_mensal_service import recalcular_fatos
+from sqlalchemy import delete, select
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from dateutil.relativedelta import relativedelta
+
+# Tabela de amortização SAC/PRICE calculada no servidor com Decimal e arredondamento em centavos.
+# Cada parcela é calculada sobre o saldo devedor já arredondado, como nos extratos dos bancos;
+# a última parcela absorve a diferença de arredondamento e zera o saldo.
+
+CENTAVOS = Decimal('0.01')
+TIPOS_SUPORTADOS = ('SAC', 'PRICE')
+
+def _centavos(valor):
+    return valor.quantize(CENTAVOS, rounding=ROUND_HALF_UP)
+
+def taxa_mensal(taxa_juros_anual):
+    # Taxa anual efetiva em % -> taxa mensal equivalente: (1 + a) ^ (1/12) - 1
+    anual = Decimal(str(taxa_juros_anual)) / 100
+    if anual == 0:
+        return Decimal('0')
+    return (1 + anual) ** (Decimal(1) / Decimal(12)) - 1
+
+def calcular_tabela(valor_financiado, taxa_juros_anual, prazo_meses, tipo_amortizacao, data_inicio):
+    if tipo_amortizacao not in TIPOS_SUPORTADOS:
+        raise ValueError(f"Tipo de amortização '{tipo_amortizacao}' não suporta geração automática de parcelas.")
+    if prazo_meses <= 0:
+        raise ValueError("O prazo deve ser maior que zero.")
+
+    saldo = _centavos(Decimal(str(valor_financiado)))
+    i = taxa_mensal(taxa_juros_anual)
+
+    if tipo_amortizacao == 'PRICE':
+        if i == 0:
+            prestacao = _centavos(saldo / prazo_meses)
+        else:
+            prestacao = _centavos(saldo * i / (1 - (1 + i) ** -prazo_meses))
+    else:
+        amortizacao = _centavos(saldo / prazo_meses)
+
+    tabela = []
+    for numero in range(1, prazo_meses + 1):
+        juros = _centavos(saldo * i)
+        principal = prestacao - juros if tipo_amortizacao == 'PRICE' else amortizacao
+        if numero == prazo_meses:
+            principal = saldo
+        saldo -= principal
+        tabela.append({
+            'numero_parcela': numero,
+            'data_vencimento': data_inicio + relativedelta(months=numero),
+            'valor_principal': principal,
+            'valor_juros': juros,
+            'valor_seguro': Decimal('0.00'),
+            'valor_taxas': Decimal('0.00'),
+            'valor_total_previsto': principal + juros
+        })
+    return tabela
+
+def parcelas_com_pagamento(financiamento):
+    return db.session.scalar(
+        select(FinanciamentoParcela.id).where(
+            FinanciamentoParcela.financiamento_id == financiamento.id,
+            FinanciamentoParcela.status.in_(['Paga', 'Amortizada'])
+        ).limit(1)
+    ) is not None
+
+def gerar_parcelas_financiamento(financiamento):
+    # Substitui as parcelas existentes pela tabela calculada, em um único lote. Não faz commit.
+    tabela = calcular_tabela(
+        financiamento.valor_total_financiado,
+        financiamento.taxa_juros_anual,
+        financiamento.prazo_meses,
+        financiamento.tipo_amortizacao,
+        financiamento.data_inicio
+    )
+
+    db.session.execute(
+        delete(FinanciamentoParcela).where(FinanciamentoParcela.financiamento_id == financiamento.id)
+    )
+    agora = datetime.utcnow()
+    for parcela in tabela:
+        parcela.update(financiamento_id=financiamento.id, status='A Pagar', data_criacao=agora)
+    gravar_lote(tabela)
+    recalcular_fatos('financiamento_parcela', financiamento.usuario_id, financiamento.id)
+    return len(tabela)
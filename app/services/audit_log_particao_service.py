@@ -0,0 +1,145 @@
+# app/services/audit_log_particao_service.py
+import re
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from app import db
+from app.models.audit_log_model import AuditLog
+from sqlalchemy import text
+from datetime import date
+from dateutil.relativedelta import relativedelta
+
+# Particionamento mensal da tabela audit_log (PostgreSQL) e retenção por remoção de partições inteiras:
+# apagar um mês antigo é um DROP TABLE, sem DELETE linha a linha nem VACUUM.
+
+TABELA = AuditLog.__tablename__
+PARTICAO_PADRAO = f'{TABELA}_default'
+_PARTICAO_RE = re.compile(rf'^{TABELA}_(\d{{4}})_(\d{{2}})$')
+
+def nome_particao(mes):
+    return f'{TABELA}_{mes.year:04d}_{mes.month:02d}'
+
+def tabela_particionada(conexao):
+    relkind = conexao.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :nome AND relkind IN ('r', 'p')"),
+        {'nome': TABELA}
+    ).scalar()
+    return relkind == 'p'
+
+def _existe(conexao, nome):
+    return conexao.execute(text("SELECT to_regclass(:nome) IS NOT NULL"), {'nome': nome}).scalar()
+
+def _intervalo(mes):
+    return f"timestamp >= '{mes.isoformat()}' AND timestamp < '{(mes + relativedelta(months=1)).isoformat()}'"
+
+def criar_particao(conexao, mes):
+    mes = mes.replace(day=1)
+    nome = nome_particao(mes)
+    if _existe(conexao, nome):
+        return
+
+    # Linhas do mês que caíram na partição padrão (ex.: execução do cron perdida) impedem o
+    # CREATE ... PARTITION OF: a padrão é desanexada, as linhas vão para a partição nova e ela volta
+    na_padrao = _existe(conexao, PARTICAO_PADRAO) and conexao.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {PARTICAO_PADRAO} WHERE {_intervalo(mes)})")
+    ).scalar()
+    if na_padrao:
+        conexao.execute(text(f"ALTER TABLE {TABELA} DETACH PARTITION {PARTICAO_PADRAO}"))
+
+    conexao.execute(text(
+        f"CREATE TABLE {nome} PARTITION OF {TABELA} "
+        f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{(mes + relativedelta(months=1)).isoformat()}')"
+    ))
+
+    if na_padrao:
+        colunas = ', '.join(column.name for column in AuditLog.__table__.columns)
+        conexao.execute(text(f"INSERT INTO {nome} ({colunas}) SELECT {colunas} FROM {PARTICAO_PADRAO} WHERE {_intervalo(mes)}"))
+        conexao.execute(text(f"DELETE FROM {PARTICAO_PADRAO} WHERE {_intervalo(mes)}"))
+        conexao.execute(text(f"ALTER TABLE {TABELA} ATTACH PARTITION {PARTICAO_PADRAO} DEFAULT"))
+
+def primeiro_mes_na_padrao(conexao):
+    if not _existe(conexao, PARTICAO_PADRAO):
+        return None
+    primeiro = conexao.execute(text(f"SELECT min(timestamp) FROM {PARTICAO_PADRAO}")).scalar()
+    return primeiro.date().replace(day=1) if primeiro else None
+
+def garantir_particoes(conexao, meses_a_frente=3, desde=None):
+    # Cria as partições do mês atual (ou de "desde", ou do mês mais antigo parado na partição padrão)
+    # até alguns meses à frente, mais a partição padrão
+    mes = min(filter(None, [desde, primeiro_mes_na_padrao(conexao), date.today()])).replace(day=1)
+    fim = date.today().replace(day=1) + relativedelta(months=meses_a_frente)
+    while mes <= fim:
+        criar_particao(conexao, mes)
+        mes += relativedelta(months=1)
+    conexao.execute(text(f"CREATE TABLE IF NOT EXISTS {PARTICAO_PADRAO} PARTITION OF {TABELA} DEFAULT"))
+
+def listar_particoes(conexao):
+    nomes = conexao.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :tabela"
+    ), {'tabela': TABELA}).scalars()
+    particoes = {}
+    for nome in nomes:
+        match = _PARTICAO_RE.match(nome)
+        if match:
+            particoes[date(int(match.group(1)), int(match.group(2)), 1)] = nome
+    return dict(sorted(particoes.items()))
+
+def aplicar_retencao(conexao, meses_retencao):
+    # Remove as partições cujo mês inteiro é anterior ao limite de retenção
+    # e as linhas antigas que tenham ficado na partição padrão
+    limite = date.today().replace(day=1) - relativedelta(months=meses_retencao)
+    removidas = []
+    for mes, nome in listar_particoes(conexao).items():
+        if mes < limite:
+            conexao.execute(text(f"DROP TABLE IF EXISTS {nome}"))
+            removidas.append(nome)
+    if _existe(conexao, PARTICAO_PADRAO):
+        conexao.execute(text(f"DELETE FROM {PARTICAO_PADRAO} WHERE timestamp < :limite"), {'limite': limite})
+    return removidas
+
+def converter_para_particionada(conexao):
+    # Migra uma tabela audit_log comum (criada antes do particionamento) para a versão particionada
+    legado = f'{TABELA}_legado'
+    conexao.execute(text(f"ALTER TABLE {TABELA} RENAME TO {legado}"))
+    conexao.execute(text(f"ALTER TABLE {legado} RENAME CONSTRAINT {TABELA}_pkey TO {legado}_pkey"))
+    AuditLog.__table__.create(conexao)
+
+    primeiro = conexao.execute(text(f"SELECT min(timestamp) FROM {legado}")).scalar()
+    garantir_particoes(conexao, desde=primeiro.date() if primeiro else None)
+
+    colunas = ', '.join(column.name for column in AuditLog.__table__.columns)
+    conexao.execute(text(f"INSERT INTO {TABELA} ({colunas}) SELECT {colunas} FROM {legado}"))
+    conexao.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{TABELA}', 'id'), "
+        f"COALESCE((SELECT max(id) FROM {TABELA}), 0) + 1, false)"
+    ))
+    conexao.execute(text(f"DROP TABLE {legado}"))
+
+audit_log_cli = AppGroup('audit-log', help='Manutenção das partições do log de auditoria.')
+
+@audit_log_cli.command('particionar')
+@click.option('--meses-a-frente', default=3, show_default=True, help='Partições futuras a criar.')
+def particionar_command(meses_a_frente):
+    """Converte audit_log para tabela particionada (se necessário) e cria as partições mensais.
+
+    Deve ser executado periodicamente (ex.: cron mensal) para manter partições à frente.
+    """
+    conexao = db.session.connection()
+    if not tabela_particionada(conexao):
+        converter_para_particionada(conexao)
+        click.echo(f"Tabela {TABELA} convertida para particionada por mês.")
+    garantir_particoes(conexao, meses_a_frente)
+    db.session.commit()
+    click.echo(f"Partições: {', '.join(listar_particoes(db.session.connection()).values())}")
+
+@audit_log_cli.command('retencao')
+@click.option('--meses', type=int, default=None, help='Meses mantidos (padrão: AUDIT_LOG_RETENCAO_MESES).')
+def retencao_command(meses):
+    """Remove as partições mensais mais antigas que o período de retenção."""
+    meses = meses if meses is not None else current_app.config['AUDIT_LOG_RETENCAO_MESES']
+    removidas = aplicar_retencao(db.session.connection(), meses)
+    db.session.commit()
+    click.echo(f"{len(removidas)} partições removidas." + (f" ({', '.join(removidas)})" if removidas else ''))
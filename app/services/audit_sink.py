@@ -0,0 +1,125 @@
+# app/services/audit_sink.py
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from app import db
+from app.models.audit_log_model import AuditLog
+from sqlalchemy import insert
+
+logger = logging.getLogger(__name__)
+
+# Eventos de auditoria vão para uma fila em memória e são gravados por uma thread em segundo plano,
+# em INSERTs com várias linhas, quando o lote enche ou o intervalo expira. Em modo 'sync'
+# (padrão nos testes) cada evento é gravado na hora, como antes.
+
+_PARAR = object()
+
+class AuditSink:
+    def __init__(self):
+        self.app = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.contadores = Counter() # event_type -> eventos gravados
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('AUDIT_SINK_MODE', None)
+        app.config.setdefault('AUDIT_SINK_BATCH_SIZE', 100)
+        app.config.setdefault('AUDIT_SINK_FLUSH_INTERVAL', 2.0)
+        atexit.register(self.shutdown)
+
+    @property
+    def mode(self):
+        mode = self.app.config.get('AUDIT_SINK_MODE')
+        if mode:
+            return mode
+        return 'sync' if self.app.testing else 'async'
+
+    def enqueue(self, event):
+        if self.mode == 'sync':
+            db.session.execute(insert(AuditLog).values([event]))
+            db.session.commit()
+            self.contadores[event['event_type']] += 1
+            return
+        self._ensure_thread()
+        self._queue.put(event)
+
+    def _ensure_thread(self):
+        # Após um fork (ex.: gunicorn --preload) a thread do processo pai não existe no filho
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-sink', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        batch_size = self.app.config['AUDIT_SINK_BATCH_SIZE']
+        interval = self.app.config['AUDIT_SINK_FLUSH_INTERVAL']
+        while True:
+            event = self._queue.get()
+            if event is _PARAR:
+                self._queue.task_done()
+                return
+
+            batch = [event]
+            stop = False
+            deadline = time.monotonic() + interval
+            while len(batch) < batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if event is _PARAR:
+                    stop = True
+                    break
+                batch.append(event)
+
+            with self.app.app_context():
+                self._write(batch)
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch):
+        try:
+            db.session.execute(insert(AuditLog).values(batch))
+            db.session.commit()
+            self.contadores.update(event['event_type'] for event in batch)
+        except Exception:
+            db.session.rollback()
+            logger.exception("Falha ao gravar %d eventos de auditoria", len(batch))
+        finally:
+            db.session.remove()
+
+    def flush(self, timeout=None):
+        # Bloqueia até a fila ser gravada (usado no desligamento e em testes)
+        if self._thread is None or not self._thread.is_alive():
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(0.01)
+
+    def shutdown(self, timeout=5.0):
+        if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+            return
+        self._queue.put(_PARAR)
+        self._thread.join(timeout)
+
+audit_sink = AuditSink()
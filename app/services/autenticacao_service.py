@@ -0,0 +1,16 @@
+# app/services/autenticacao_service.py
+from app.models.usuario_model import Usuario
+from sqlalchemy import func
+
+# O formulário de login aceita login ou e-mail. Em vez de um OR entre as duas colunas (que o
+# planejador não resolve bem com dois índices separados), o formato da entrada decide a coluna:
+# logins não podem conter '@', então qualquer '@' indica e-mail.
+
+def buscar_usuario_para_login(identificador):
+    identificador = (identificador or '').strip()
+    if not identificador:
+        return None
+    if '@' in identificador:
+        # E-mails são gravados em minúsculas; lower() usa o índice funcional ix_usuario_email_lower
+        return Usuario.query.filter(func.lower(Usuario.email) == identificador.lower()).first()
+    return Usuario.query.filter(Usuario.login == identificador).first()
@@ -0,0 +1,162 @@
+# app/services/barramento_invalidacao.py
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from app import db
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Barramento de invalidação entre processos (workers). Durante a transação, os caches locais
+# publicam o que precisa ser descartado; no commit, o lote inteiro segue num único pg_notify,
+# que o PostgreSQL só entrega aos ouvintes se a transação for confirmada. Cada worker mantém
+# uma thread em LISTEN que repassa as mensagens aos tratadores registrados por tipo.
+
+CANAL = 'web_fin_invalidacao'
+# O payload do NOTIFY é limitado a 8000 bytes: lotes maiores viram um pedido para limpar tudo
+TAMANHO_MAXIMO_PAYLOAD = 7500
+LIMPAR_TUDO = '*'
+# Sem mensagens nesse intervalo, a conexão do LISTEN é testada com um SELECT 1
+INTERVALO_VERIFICACAO = 60
+
+class BarramentoInvalidacao:
+    def __init__(self):
+        self.app = None
+        self.ativo = False
+        self._tratadores = {} # tipo -> (aplicar(*args), limpar())
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._origem = None
+        self._origem_pid = None
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('INVALIDACAO_BUS', None)
+        modo = app.config['INVALIDACAO_BUS']
+        if not modo:
+            modo = 'postgres' if str(app.config.get('SQLALCHEMY_DATABASE_URI') or '').startswith('postgresql') else 'off'
+        if modo not in ('postgres', 'off'):
+            raise ValueError(f"INVALIDACAO_BUS inválido: {modo}")
+        self.ativo = modo == 'postgres'
+        if self.ativo:
+            app.before_request(self._garantir_ouvinte)
+
+    def registrar(self, tipo, aplicar, limpar):
+        # limpar() é chamado quando mensagens podem ter sido perdidas (reconexão ou lote grande demais)
+        self._tratadores[tipo] = (aplicar, limpar)
+
+    def publicar(self, session, tipo, *args):
+        # args precisam ser serializáveis em JSON; repetições na mesma transação são descartadas
+        if self.ativo:
+            session.info.setdefault('invalidacoes_publicar', {})[(tipo, *args)] = None
+
+    @property
+    def origem(self):
+        # Identifica as mensagens do próprio processo. O pid não serve: em contêineres, workers
+        # de máquinas diferentes costumam ter o mesmo pid. Um id novo é gerado após um fork
+        if self._origem_pid != os.getpid():
+            with self._lock:
+                if self._origem_pid != os.getpid():
+                    self._origem = uuid.uuid4().hex
+                    self._origem_pid = os.getpid()
+        return self._origem
+
+    def _garantir_ouvinte(self):
+        # Após um fork (ex.: gunicorn --preload) a thread do processo pai não existe no filho
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._ouvir, name='barramento-invalidacao', daemon=True)
+            self._thread.start()
+
+    def _ouvir(self):
+        espera = 1
+        while True:
+            conexao = None
+            try:
+                with self.app.app_context():
+                    if db.engine.dialect.driver != 'psycopg2':
+                        logger.error("Barramento de invalidação requer o driver psycopg2 (atual: %s)", db.engine.dialect.driver)
+                        return
+                    conexao = db.engine.raw_connection()
+                # Conexão exclusiva do ouvinte, fora do pool
+                conexao.detach()
+                dbapi = conexao.driver_connection
+                dbapi.autocommit = True
+                with dbapi.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CANAL}')
+                # Mensagens enviadas antes do LISTEN (início ou queda da conexão) se perderam
+                self._limpar_tudo()
+                espera = 1
+                while True:
+                    if select.select([dbapi], [], [], INTERVALO_VERIFICACAO) == ([], [], []):
+                        with dbapi.cursor() as cursor:
+                            cursor.execute('SELECT 1')
+                        continue
+                    dbapi.poll()
+                    while dbapi.notifies:
+                        self._receber(dbapi.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Conexão do barramento de invalidação perdida; reconectando em %ds", espera)
+                if conexao is not None:
+                    try:
+                        conexao.close()
+                    except Exception:
+                        pass
+                time.sleep(espera)
+                espera = min(espera * 2, 30)
+
+    def _receber(self, payload):
+        dados = json.loads(payload)
+        # O próprio processo já aplicou as invalidações no after_commit
+        if dados.get('origem') == self.origem:
+            return
+        for tipo, *args in dados['mensagens']:
+            if tipo == LIMPAR_TUDO:
+                self._limpar_tudo()
+                return
+            tratador = self._tratadores.get(tipo)
+            if tratador is None:
+                continue
+            try:
+                tratador[0](*args)
+            except Exception:
+                logger.exception("Falha ao aplicar invalidação %s %s", tipo, args)
+
+    def _limpar_tudo(self):
+        for tipo, (_, limpar) in self._tratadores.items():
+            try:
+                limpar()
+            except Exception:
+                logger.exception("Falha ao limpar o cache %s", tipo)
+
+barramento = BarramentoInvalidacao()
+
+@event.listens_for(Session, 'before_commit')
+def _publicar_no_commit(session):
+    if not barramento.ativo:
+        return
+    # O commit ainda faria o flush final; antecipado aqui para que suas invalidações entrem no lote
+    session.flush()
+    mensagens = session.info.pop('invalidacoes_publicar', None)
+    if not mensagens:
+        return
+    payload = json.dumps({'origem': barramento.origem, 'mensagens': list(mensagens)})
+    if len(payload.encode()) > TAMANHO_MAXIMO_PAYLOAD:
+        payload = json.dumps({'origem': barramento.origem, 'mensagens': [[LIMPAR_TUDO]]})
+    session.execute(text('SELECT pg_notify(:canal, :payload)'), {'canal': CANAL, 'payload': payload})
+
+@event.listens_for(Session, 'after_transaction_end')
+def _descartar_no_fim(session, transaction):
+    # Só a transação externa: o rollback de um savepoint não desfaz o que a transação já publicou
+    if transaction.parent is None:
+        session.info.pop('invalidacoes_publicar', None)
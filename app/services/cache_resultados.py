@@ -0,0 +1,252 @@
+# app/services/cache_resultados.py
+import fnmatch
+import pickle
+import threading
+from collections import Counter, OrderedDict
+from datetime import date
+from app.models.conta_movimento_model import ContaMovimento
+from app.models.conta_transacao_model import ContaTransacao
+from app.models.crediario_model import Crediario
+from app.models.crediario_grupo_model import CrediarioGrupo
+from app.models.crediario_movimento_model import CrediarioMovimento
+from app.services.barramento_invalidacao import barramento
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+# Cache de resultados dos extratos, por escopo ("extrato_conta:<usuario>:<conta>") e mês.
+# O extrato de um mês depende dos lançamentos daquele mês e, pelo saldo inicial, dos anteriores:
+# uma alteração no mês M invalida apenas os meses >= M do escopo. As invalidações são coletadas
+# no flush e aplicadas depois do commit. O backend padrão é um LRU na memória do processo;
+# 'redis' compartilha entre processos e 'local' usa o mesmo backend sobre um cliente em memória.
+# Com o LRU por processo, as invalidações também seguem pelo barramento para os outros workers.
+
+_NADA = object()
+
+class BackendMemoria:
+    def __init__(self, max_itens):
+        self._itens = OrderedDict() # (escopo, mes) -> valor
+        self._lock = threading.Lock()
+        self._max_itens = max_itens
+
+    def obter(self, escopo, mes):
+        with self._lock:
+            valor = self._itens.get((escopo, mes), _NADA)
+            if valor is not _NADA:
+                self._itens.move_to_end((escopo, mes))
+            return valor
+
+    def gravar(self, escopo, mes, valor):
+        with self._lock:
+            self._itens[(escopo, mes)] = valor
+            self._itens.move_to_end((escopo, mes))
+            while len(self._itens) > self._max_itens:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, escopo, mes_minimo=None):
+        with self._lock:
+            for chave in [chave for chave in self._itens if chave[0] == escopo and (mes_minimo is None or chave[1] >= mes_minimo)]:
+                del self._itens[chave]
+
+    def invalidar_prefixo(self, prefixo):
+        with self._lock:
+            for chave in [chave for chave in self._itens if chave[0].startswith(prefixo)]:
+                del self._itens[chave]
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def __len__(self):
+        return len(self._itens)
+
+class BackendCompartilhado:
+    # Um hash por escopo (campo = mês ISO); usa apenas hget/hset/hkeys/hdel/delete/expire/scan_iter
+    def __init__(self, cliente, ttl, prefixo='web_fin:cache:'):
+        self._cliente = cliente
+        self._ttl = ttl
+        self._prefixo = prefixo
+
+    def obter(self, escopo, mes):
+        dados = self._cliente.hget(self._prefixo + escopo, mes.isoformat())
+        return _NADA if dados is None else pickle.loads(dados)
+
+    def gravar(self, escopo, mes, valor):
+        chave = self._prefixo + escopo
+        self._cliente.hset(chave, mes.isoformat(), pickle.dumps(valor))
+        self._cliente.expire(chave, self._ttl)
+
+    def invalidar(self, escopo, mes_minimo=None):
+        chave = self._prefixo + escopo
+        if mes_minimo is None:
+            self._cliente.delete(chave)
+            return
+        campos = [campo for campo in self._cliente.hkeys(chave) if _texto(campo) >= mes_minimo.isoformat()]
+        if campos:
+            self._cliente.hdel(chave, *campos)
+
+    def invalidar_prefixo(self, prefixo):
+        for chave in list(self._cliente.scan_iter(match=self._prefixo + prefixo + '*')):
+            self._cliente.delete(chave)
+
+    def __len__(self):
+        return sum(len(self._cliente.hkeys(chave)) for chave in self._cliente.scan_iter(match=self._prefixo + '*'))
+
+def _texto(valor):
+    return valor.decode() if isinstance(valor, bytes) else valor
+
+class ClienteLocal:
+    # Substituto local do Redis para desenvolvimento e testes, com o subconjunto usado acima
+    def __init__(self):
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def hget(self, chave, campo):
+        with self._lock:
+            return self._hashes.get(chave, {}).get(campo)
+
+    def hset(self, chave, campo, valor):
+        with self._lock:
+            self._hashes.setdefault(chave, {})[campo] = valor
+
+    def hkeys(self, chave):
+        with self._lock:
+            return list(self._hashes.get(chave, {}))
+
+    def hdel(self, chave, *campos):
+        with self._lock:
+            for campo in campos:
+                self._hashes.get(chave, {}).pop(campo, None)
+
+    def delete(self, chave):
+        with self._lock:
+            self._hashes.pop(chave, None)
+
+    def expire(self, chave, segundos):
+        pass
+
+    def scan_iter(self, match='*'):
+        with self._lock:
+            return [chave for chave in self._hashes if fnmatch.fnmatchcase(chave, match)]
+
+class CacheResultados:
+    def __init__(self):
+        self.backend = None
+        self.contadores = Counter()
+
+    def init_app(self, app):
+        app.config.setdefault('RESULT_CACHE_BACKEND', 'memoria')
+        app.config.setdefault('RESULT_CACHE_MAX_ITENS', 2000)
+        app.config.setdefault('RESULT_CACHE_TTL', 86400)
+        app.config.setdefault('RESULT_CACHE_REDIS_URL', None)
+
+        tipo = app.config['RESULT_CACHE_BACKEND']
+        if tipo == 'off':
+            self.backend = None
+        elif tipo == 'memoria':
+            self.backend = BackendMemoria(app.config['RESULT_CACHE_MAX_ITENS'])
+        elif tipo == 'local':
+            self.backend = BackendCompartilhado(ClienteLocal(), app.config['RESULT_CACHE_TTL'])
+        elif tipo == 'redis':
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("RESULT_CACHE_BACKEND='redis', mas o pacote 'redis' não está instalado.")
+            cliente = redis.Redis.from_url(app.config['RESULT_CACHE_REDIS_URL'])
+            self.backend = BackendCompartilhado(cliente, app.config['RESULT_CACHE_TTL'])
+        else:
+            raise ValueError(f"RESULT_CACHE_BACKEND inválido: {tipo}")
+
+    def obter_ou_calcular(self, namespace, escopo, mes, calcular):
+        if self.backend is None:
+            return calcular()
+        escopo = f'{namespace}:{escopo}'
+        valor = self.backend.obter(escopo, mes)
+        if valor is not _NADA:
+            self.contadores[f'{namespace}_hit'] += 1
+            return valor
+        self.contadores[f'{namespace}_miss'] += 1
+        valor = calcular()
+        self.backend.gravar(escopo, mes, valor)
+        return valor
+
+    def invalidar(self, escopo, mes_minimo=None):
+        if self.backend is not None:
+            self.backend.invalidar(escopo, mes_minimo)
+
+    def invalidar_prefixo(self, prefixo):
+        if self.backend is not None:
+            self.backend.invalidar_prefixo(prefixo)
+
+    @property
+    def local(self):
+        # Cache próprio do processo: os outros workers precisam ser avisados das invalidações
+        return isinstance(self.backend, BackendMemoria)
+
+    def limpar(self):
+        if self.local:
+            self.backend.limpar()
+
+    def metricas(self):
+        metricas = dict(self.contadores)
+        metricas['itens'] = len(self.backend) if self.backend is not None else 0
+        return metricas
+
+cache_resultados = CacheResultados()
+
+def escopo_extrato_conta(usuario_id, conta_id):
+    return f'{usuario_id}:{conta_id}'
+
+def escopo_extrato_crediario(usuario_id, crediario_id):
+    # crediario_id 'all' = extrato de todos os crediários do usuário
+    return f'{usuario_id}:{crediario_id}'
+
+def _valores(obj, atributo):
+    # Valor atual e anterior (se alterado no flush)
+    historico = inspect(obj).attrs[atributo].history
+    atual = getattr(obj, atributo)
+    return [atual] + [valor for valor in historico.deleted if valor is not None and valor != atual]
+
+def _invalidar_depois(session, escopo, mes):
+    session.info.setdefault('cache_invalidacoes', []).append((escopo, mes))
+    if cache_resultados.local:
+        barramento.publicar(session, 'cache_resultados', escopo, mes.isoformat() if mes else None)
+
+@event.listens_for(Session, 'before_flush')
+def _coletar_invalidacoes(session, flush_context, instances):
+    with session.no_autoflush:
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            if isinstance(obj, ContaMovimento):
+                mes = min(valor for valor in _valores(obj, 'data')).replace(day=1)
+                _invalidar_depois(session, 'extrato_conta:' + escopo_extrato_conta(obj.usuario_id, obj.conta_id), mes)
+            elif isinstance(obj, CrediarioMovimento):
+                # As parcelas começam na primeira_parcela; o extrato "todos" também muda
+                mes = min(valor for valor in _valores(obj, 'primeira_parcela')).replace(day=1)
+                _invalidar_depois(session, 'extrato_crediario:' + escopo_extrato_crediario(obj.usuario_id, obj.crediario_id), mes)
+                _invalidar_depois(session, 'extrato_crediario:' + escopo_extrato_crediario(obj.usuario_id, 'all'), mes)
+            elif isinstance(obj, ContaTransacao):
+                # Nome/tipo da transação aparecem em todos os extratos das contas do usuário
+                _invalidar_depois(session, f'extrato_conta:{obj.usuario_id}:', None)
+            elif isinstance(obj, (Crediario, CrediarioGrupo)):
+                _invalidar_depois(session, f'extrato_crediario:{obj.usuario_id}:', None)
+
+def _aplicar(escopo, mes):
+    if escopo.endswith(':'):
+        cache_resultados.invalidar_prefixo(escopo)
+    else:
+        cache_resultados.invalidar(escopo, mes)
+
+def _aplicar_remoto(escopo, mes_iso):
+    _aplicar(escopo, date.fromisoformat(mes_iso) if mes_iso else None)
+
+barramento.registrar('cache_resultados', _aplicar_remoto, cache_resultados.limpar)
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_invalidacoes(session):
+    for escopo, mes in session.info.pop('cache_invalidacoes', []):
+        _aplicar(escopo, mes)
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_invalidacoes(session):
+    session.info.pop('cache_invalidacoes', None)
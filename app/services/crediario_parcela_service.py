@@ -0,0 +1,52 @@
+# app/services/crediario_parcela_service.py
+from app import db
+from app.models.crediario_parcela_model import CrediarioParcela
+from app.services.fato_mensal_service import novos_deltas, somar, aplicar_deltas
+from sqlalchemy import insert, select, update
+from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+
+# Parcelas de crediário gravadas em lote, na mesma transação da compra.
+
+def gerar_parcelas(movimento):
+    # O movimento já deve ter id (session.flush()); um único INSERT com várias linhas
+    parcelas = [
+        {
+            'crediario_movimento_id': movimento.id,
+            'numero_parcela': i + 1,
+            'vencimento': movimento.primeira_parcela + relativedelta(months=i),
+            'valor_parcela': movimento.valor_parcela_mensal
+        }
+        for i in range(movimento.num_parcelas)
+    ]
+    if parcelas:
+        db.session.execute(insert(CrediarioParcela).values(parcelas))
+
+    # O INSERT via Core não passa pelo before_flush: os fatos mensais são somados aqui
+    deltas = novos_deltas()
+    for parcela in parcelas:
+        somar(deltas, movimento.usuario_id, parcela['vencimento'], 'crediario_parcela',
+              movimento.crediario_grupo_id, parcela['valor_parcela'], 1)
+    aplicar_deltas(deltas)
+    return len(parcelas)
+
+def atualizar_valor_parcelas(movimento):
+    # Valores anteriores, para ajustar os fatos mensais pela diferença
+    anteriores = db.session.execute(
+        select(CrediarioParcela.vencimento, CrediarioParcela.valor_parcela).where(
+            CrediarioParcela.crediario_movimento_id == movimento.id
+        )
+    ).all()
+
+    # Um único UPDATE para todas as parcelas do movimento
+    db.session.execute(
+        update(CrediarioParcela).where(
+            CrediarioParcela.crediario_movimento_id == movimento.id
+        ).values(valor_parcela=movimento.valor_parcela_mensal)
+    )
+
+    deltas = novos_deltas()
+    for vencimento, valor_anterior in anteriores:
+        somar(deltas, movimento.usuario_id, vencimento, 'crediario_parcela',
+              movimento.crediario_grupo_id, Decimal(str(movimento.valor_parcela_mensal)) - valor_anterior, 0)
+    aplicar_deltas(deltas)
@@ -0,0 +1,122 @@
+# app/services/dados_referencia_service.py
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import current_app
+from app import db
+from app.models.conta_model import Conta
+from app.models.conta_transacao_model import ContaTransacao
+from app.models.crediario_model import Crediario
+from app.models.crediario_grupo_model import CrediarioGrupo
+from app.models.renda_model import Renda
+from app.models.despesa_receita_model import DespesaReceita
+from app.services.barramento_invalidacao import barramento
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+# Cache local do processo com as listas de cadastro usadas nos <select> dos formulários
+# (contas, tipos de transação, crediários, grupos, rendas e itens de despesa/receita).
+# Guarda registros leves e somente leitura, por (usuário, lista). Alterações nesses cadastros
+# invalidam a lista do usuário depois do commit e seguem pelo barramento para os outros workers.
+
+# Lista -> modelo, colunas do registro (id primeiro) e ordenação
+Referencia = namedtuple('Referencia', ['modelo', 'registro', 'ordem'])
+
+def _referencia(modelo, colunas, ordem):
+    return Referencia(modelo, namedtuple(modelo.__name__ + 'Ref', colunas), ordem)
+
+REFERENCIAS = {
+    'contas': _referencia(Conta, ['id', 'nome_banco', 'conta', 'tipo'], [Conta.nome_banco, Conta.conta]),
+    'tipos_transacao': _referencia(ContaTransacao, ['id', 'transacao', 'tipo'], [ContaTransacao.transacao]),
+    'crediarios': _referencia(Crediario, ['id', 'crediario', 'tipo'], [Crediario.crediario]),
+    'crediario_grupos': _referencia(CrediarioGrupo, ['id', 'grupo', 'tipo'], [CrediarioGrupo.grupo]),
+    'rendas': _referencia(Renda, ['id', 'descricao', 'tipo'], [Renda.descricao]),
+    'despesas_receitas': _referencia(DespesaReceita, ['id', 'despesa_receita', 'tipo'], [DespesaReceita.despesa_receita]),
+}
+
+_lista_do_modelo = {referencia.modelo: nome for nome, referencia in REFERENCIAS.items()}
+
+_lock = threading.Lock()
+_entradas = OrderedDict() # (usuario_id, lista) -> (expira_em, registros)
+_versoes = {}
+
+def invalidar_referencias(usuario_id, lista):
+    with _lock:
+        _versoes[(usuario_id, lista)] = _versoes.get((usuario_id, lista), 0) + 1
+        _entradas.pop((usuario_id, lista), None)
+
+def limpar_referencias():
+    with _lock:
+        _entradas.clear()
+
+def _consultar(lista, usuario_id):
+    referencia = REFERENCIAS[lista]
+    colunas = [getattr(referencia.modelo, coluna) for coluna in referencia.registro._fields]
+    query = select(*colunas).where(referencia.modelo.usuario_id == usuario_id).order_by(*referencia.ordem)
+    return tuple(referencia.registro(*linha) for linha in db.session.execute(query))
+
+def _registros(lista, usuario_id):
+    ttl = current_app.config['REFERENCIA_CACHE_TTL']
+    if ttl <= 0:
+        return _consultar(lista, usuario_id)
+
+    agora = time.monotonic()
+    chave = (usuario_id, lista)
+    with _lock:
+        versao = _versoes.get(chave, 0)
+        entrada = _entradas.get(chave)
+        if entrada is not None and entrada[0] > agora:
+            _entradas.move_to_end(chave)
+            return entrada[1]
+
+    registros = _consultar(lista, usuario_id)
+    with _lock:
+        # Invalidada durante a consulta: devolve o resultado sem guardá-lo
+        if _versoes.get(chave, 0) == versao:
+            _entradas[chave] = (agora + ttl, registros)
+            _entradas.move_to_end(chave)
+            while len(_entradas) > current_app.config['REFERENCIA_CACHE_MAX']:
+                _entradas.popitem(last=False)
+    return registros
+
+def listar_referencias(lista, usuario_id, tipo=None):
+    registros = _registros(lista, usuario_id)
+    if tipo is not None:
+        return [registro for registro in registros if registro.tipo == tipo]
+    return list(registros)
+
+def obter_referencia(lista, usuario_id, registro_id, tipo=None):
+    # Validação do id enviado pelo formulário, sem consultar o banco
+    for registro in _registros(lista, usuario_id):
+        if registro.id == registro_id:
+            return registro if tipo is None or registro.tipo == tipo else None
+    return None
+
+barramento.registrar('referencias', invalidar_referencias, limpar_referencias)
+
+def _alterou_registro(obj, lista):
+    estado = inspect(obj)
+    return any(estado.attrs[campo].history.has_changes() for campo in (*REFERENCIAS[lista].registro._fields, 'usuario_id'))
+
+@event.listens_for(Session, 'before_flush')
+def _coletar_invalidacoes(session, flush_context, instances):
+    pendentes = session.info.setdefault('referencias_invalidacoes', set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        lista = _lista_do_modelo.get(type(obj))
+        if lista is None:
+            continue
+        # Alterações em colunas que não aparecem nos formulários (saldo, limite, descrição) não invalidam
+        if obj in session.dirty and not _alterou_registro(obj, lista):
+            continue
+        for usuario_id in {obj.usuario_id, *inspect(obj).attrs['usuario_id'].history.deleted} - {None}:
+            pendentes.add((usuario_id, lista))
+            barramento.publicar(session, 'referencias', usuario_id, lista)
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_invalidacoes(session):
+    for usuario_id, lista in session.info.pop('referencias_invalidacoes', ()):
+        invalidar_referencias(usuario_id, lista)
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_invalidacoes(session):
+    session.info.pop('referencias_invalidacoes', None)
@@ -0,0 +1,103 @@
+# app/services/dashboard_service.py
+from collections import namedtuple
+from app import db
+from app.models.conta_model import Conta
+from app.models.conta_saldo_mensal_model import ContaSaldoMensal
+from app.models.crediario_model import Crediario
+from app.models.crediario_movimento_model import CrediarioMovimento
+from app.models.crediario_parcela_model import CrediarioParcela
+from app.models.financiamento_model import Financiamento
+from app.models.financiamento_parcela_model import FinanciamentoParcela
+from app.models.despesa_fixa_model import DespesaFixa
+from app.models.despesa_receita_model import DespesaReceita
+from app.models.renda_model import Renda
+from app.models.renda_movimento_model import RendaMovimento
+from sqlalchemy import cast, func, literal, select, union_all
+from decimal import Decimal
+
+# Resumo do mês para o dashboard: cada seção é uma agregação agrupada e todas seguem juntas
+# num único UNION ALL, em uma ida ao banco, independentemente do tamanho do histórico.
+
+SECOES = ('contas', 'crediarios', 'financiamentos', 'despesas_fixas', 'rendas')
+
+ItemResumo = namedtuple('ItemResumo', ['id', 'rotulo', 'valor'])
+
+def _linha(secao, id_coluna, rotulo, valor):
+    return (
+        literal(secao).label('secao'),
+        id_coluna.label('id'),
+        cast(rotulo, db.String).label('rotulo'),
+        cast(func.coalesce(valor, 0), db.Numeric(14, 2)).label('valor')
+    )
+
+def consulta_resumo_mes(usuario_id, mes, proximo_mes):
+    # Saldo de cada conta no fim do mês: saldo inicial + checkpoint mais recente até o mês (ver saldo_mensal_service)
+    ultimo_checkpoint = select(ContaSaldoMensal.saldo_acumulado).where(
+        ContaSaldoMensal.conta_id == Conta.id,
+        ContaSaldoMensal.mes <= mes
+    ).order_by(ContaSaldoMensal.mes.desc()).limit(1).correlate(Conta).scalar_subquery()
+
+    contas = select(*_linha(
+        'contas', Conta.id, Conta.nome_banco + ' - ' + Conta.conta,
+        Conta.saldo_inicial + func.coalesce(ultimo_checkpoint, 0)
+    )).where(Conta.usuario_id == usuario_id)
+
+    crediarios = select(*_linha(
+        'crediarios', Crediario.id, Crediario.crediario, func.sum(CrediarioParcela.valor_parcela)
+    )).select_from(CrediarioParcela).join(
+        CrediarioMovimento, CrediarioParcela.crediario_movimento_id == CrediarioMovimento.id
+    ).join(
+        Crediario, CrediarioMovimento.crediario_id == Crediario.id
+    ).where(
+        CrediarioMovimento.usuario_id == usuario_id,
+        CrediarioParcela.vencimento >= mes,
+        CrediarioParcela.vencimento < proximo_mes
+    ).group_by(Crediario.id, Crediario.crediario)
+
+    financiamentos = select(*_linha(
+        'financiamentos', Financiamento.id, Financiamento.nome_financiamento,
+        func.sum(FinanciamentoParcela.valor_total_previsto)
+    )).select_from(FinanciamentoParcela).join(
+        Financiamento, FinanciamentoParcela.financiamento_id == Financiamento.id
+    ).where(
+        Financiamento.usuario_id == usuario_id,
+        FinanciamentoParcela.data_vencimento >= mes,
+        FinanciamentoParcela.data_vencimento < proximo_mes
+    ).group_by(Financiamento.id, Financiamento.nome_financiamento)
+
+    despesas_fixas = select(*_linha(
+        'despesas_fixas', DespesaReceita.id, DespesaReceita.despesa_receita, func.sum(DespesaFixa.valor)
+    )).select_from(DespesaFixa).join(
+        DespesaReceita, DespesaFixa.despesa_receita_id == DespesaReceita.id
+    ).where(
+        DespesaFixa.usuario_id == usuario_id,
+        DespesaFixa.mes_ano >= mes,
+        DespesaFixa.mes_ano < proximo_mes
+    ).group_by(DespesaReceita.id, DespesaReceita.despesa_receita)
+
+    rendas = select(*_linha(
+        'rendas', Renda.id, Renda.descricao, func.sum(RendaMovimento.valor)
+    )).select_from(RendaMovimento).join(
+        Renda, RendaMovimento.renda_id == Renda.id
+    ).where(
+        RendaMovimento.usuario_id == usuario_id,
+        RendaMovimento.mes_pagto >= mes,
+        RendaMovimento.mes_pagto < proximo_mes
+    ).group_by(Renda.id, Renda.descricao)
+
+    return union_all(contas, crediarios, financiamentos, despesas_fixas, rendas)
+
+def resumo_do_mes(usuario_id, mes, proximo_mes):
+    resumo = {secao: {'itens': [], 'total': Decimal('0.00')} for secao in SECOES}
+    for linha in db.session.execute(consulta_resumo_mes(usuario_id, mes, proximo_mes)):
+        secao = resumo[linha.secao]
+        secao['itens'].append(ItemResumo(linha.id, linha.rotulo, linha.valor))
+        secao['total'] += linha.valor
+    for secao in resumo.values():
+        secao['itens'].sort(key=lambda item: item.rotulo)
+
+    # Entradas previstas menos compromissos do mês
+    resumo['saldo_previsto_mes'] = resumo['rendas']['total'] - (
+        resumo['crediarios']['total'] + resumo['financiamentos']['total'] + resumo['despesas_fixas']['total']
+    )
+    return resumo
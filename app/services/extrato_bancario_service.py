@@ -0,0 +1,49 @@
+# app/services/extrato_bancario_service.py
+from app import db
+from app.models.conta_movimento_model import ContaMovimento
+from app.models.conta_transacao_model import ContaTransacao
+from app.services.saldo_mensal_service import saldo_anterior_ao_mes, valor_com_sinal_sql
+from app.services.cache_resultados import cache_resultados, escopo_extrato_conta
+from sqlalchemy import func, literal
+
+# Camada de consulta do extrato: toda a aritmética de saldo é feita pelo banco.
+# O resultado de cada mês fica no cache de resultados até um lançamento do mês ou anterior mudar.
+
+def saldo_inicial_mes(conta, mes):
+    return conta.saldo_inicial + saldo_anterior_ao_mes(conta.id, mes)
+
+def consulta_movimentos_do_mes(conta_id, mes, proximo_mes, saldo_inicial):
+    # Linhas planas (sem objetos ORM nem lazy loads) com o saldo corrente calculado por função de janela
+    ordem = (ContaMovimento.data, ContaMovimento.data_criacao, ContaMovimento.id)
+    saldo_corrente = literal(saldo_inicial, db.Numeric(14, 2)) + func.sum(valor_com_sinal_sql).over(order_by=ordem)
+
+    return db.session.query(
+        ContaMovimento.id,
+        ContaMovimento.data,
+        ContaMovimento.valor,
+        ContaMovimento.descricao,
+        ContaTransacao.transacao,
+        ContaTransacao.tipo,
+        saldo_corrente.label('saldo')
+    ).join(
+        ContaTransacao, ContaMovimento.conta_transacao_id == ContaTransacao.id
+    ).filter(
+        ContaMovimento.conta_id == conta_id,
+        ContaMovimento.data >= mes,
+        ContaMovimento.data < proximo_mes
+    ).order_by(*ordem)
+
+def movimentos_do_mes(conta_id, mes, proximo_mes, saldo_inicial):
+    return consulta_movimentos_do_mes(conta_id, mes, proximo_mes, saldo_inicial).all()
+
+def _calcular_extrato(conta, mes, proximo_mes):
+    saldo_inicial = saldo_inicial_mes(conta, mes)
+    movimentos = [movimento._asdict() for movimento in movimentos_do_mes(conta.id, mes, proximo_mes, saldo_inicial)]
+    saldo_final = movimentos[-1]['saldo'] if movimentos else saldo_inicial
+    return saldo_inicial, movimentos, saldo_final
+
+def extrato_do_mes(conta, mes, proximo_mes):
+    return cache_resultados.obter_ou_calcular(
+        'extrato_conta', escopo_extrato_conta(conta.usuario_id, conta.id), mes,
+        lambda: _calcular_extrato(conta, mes, proximo_mes)
+    )
@@ -0,0 +1,45 @@
+# app/services/extrato_crediario_service.py
+from app import db
+from app.models.crediario_model import Crediario
+from app.models.crediario_grupo_model import CrediarioGrupo
+from app.models.crediario_movimento_model import CrediarioMovimento
+from app.models.crediario_parcela_model import CrediarioParcela
+from app.services.cache_resultados import cache_resultados, escopo_extrato_crediario
+from decimal import Decimal
+
+# Parcelas do mês em linhas planas (um SELECT com os JOINs), guardadas no cache de resultados.
+
+def consulta_extrato(usuario_id, crediario_id, mes, proximo_mes):
+    query = db.session.query(
+        Crediario.crediario,
+        CrediarioGrupo.grupo,
+        CrediarioParcela.numero_parcela,
+        CrediarioParcela.vencimento,
+        CrediarioParcela.valor_parcela,
+        CrediarioMovimento.data_compra,
+        CrediarioMovimento.descricao
+    ).join(
+        CrediarioMovimento, CrediarioParcela.crediario_movimento_id == CrediarioMovimento.id
+    ).join(
+        Crediario, CrediarioMovimento.crediario_id == Crediario.id
+    ).join(
+        CrediarioGrupo, CrediarioMovimento.crediario_grupo_id == CrediarioGrupo.id
+    ).filter(
+        Crediario.usuario_id == usuario_id,
+        CrediarioParcela.vencimento >= mes,
+        CrediarioParcela.vencimento < proximo_mes
+    )
+    if crediario_id != 'all':
+        query = query.filter(Crediario.id == crediario_id)
+    return query.order_by(CrediarioParcela.vencimento, CrediarioParcela.numero_parcela)
+
+def _calcular_extrato(usuario_id, crediario_id, mes, proximo_mes):
+    parcelas = [parcela._asdict() for parcela in consulta_extrato(usuario_id, crediario_id, mes, proximo_mes)]
+    total = sum((parcela['valor_parcela'] for parcela in parcelas), Decimal('0.00'))
+    return parcelas, total
+
+def extrato_crediario_do_mes(usuario_id, crediario_id, mes, proximo_mes):
+    return cache_resultados.obter_ou_calcular(
+        'extrato_crediario', escopo_extrato_crediario(usuario_id, crediario_id), mes,
+        lambda: _calcular_extrato(usuario_id, crediario_id, mes, proximo_mes)
+    )
@@ -0,0 +1,191 @@
+# app/services/fato_mensal_service.py
+import click
+from collections import defaultdict, namedtuple
+from flask.cli import with_appcontext
+from app import db
+from app.models.fato_mensal_model import FatoMensal
+from app.models.conta_movimento_model import ContaMovimento
+from app.models.crediario_movimento_model import CrediarioMovimento
+from app.models.crediario_parcela_model import CrediarioParcela
+from app.models.financiamento_model import Financiamento
+from app.models.financiamento_parcela_model import FinanciamentoParcela
+from app.models.despesa_fixa_model import DespesaFixa
+from app.models.renda_movimento_model import RendaMovimento
+from sqlalchemy import delete, event, extract, func, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from datetime import date
+from decimal import Decimal
+
+# Tabela de fatos fato_mensal: soma e quantidade por (usuário, mês, origem, categoria).
+# Gravações pelo ORM são contabilizadas automaticamente no before_flush; os caminhos em lote
+# (parcelas de crediário e de financiamento gravadas via Core/COPY) chamam este módulo explicitamente.
+# "flask rebuild-fatos-mensais" recalcula tudo a partir das tabelas de origem.
+
+# Origem -> modelo, colunas de usuário, data, categoria e valor, e junção necessária para chegar ao usuário
+Fonte = namedtuple('Fonte', ['modelo', 'usuario', 'data', 'categoria', 'valor', 'juncao'])
+
+FONTES = {
+    'conta_movimento': Fonte(ContaMovimento, ContaMovimento.usuario_id, ContaMovimento.data,
+                             ContaMovimento.conta_transacao_id, ContaMovimento.valor, None),
+    'crediario_parcela': Fonte(CrediarioParcela, CrediarioMovimento.usuario_id, CrediarioParcela.vencimento,
+                               CrediarioMovimento.crediario_grupo_id, CrediarioParcela.valor_parcela,
+                               (CrediarioMovimento, CrediarioParcela.crediario_movimento_id == CrediarioMovimento.id)),
+    'financiamento_parcela': Fonte(FinanciamentoParcela, Financiamento.usuario_id, FinanciamentoParcela.data_vencimento,
+                                   FinanciamentoParcela.financiamento_id, FinanciamentoParcela.valor_total_previsto,
+                                   (Financiamento, FinanciamentoParcela.financiamento_id == Financiamento.id)),
+    'despesa_fixa': Fonte(DespesaFixa, DespesaFixa.usuario_id, DespesaFixa.mes_ano,
+                          DespesaFixa.despesa_receita_id, DespesaFixa.valor, None),
+    'renda_movimento': Fonte(RendaMovimento, RendaMovimento.usuario_id, RendaMovimento.mes_pagto,
+                             RendaMovimento.renda_id, RendaMovimento.valor, None),
+}
+
+def novos_deltas():
+    return defaultdict(lambda: [Decimal('0.00'), 0])
+
+def somar(deltas, usuario_id, data, origem, categoria_id, valor, quantidade):
+    delta = deltas[(usuario_id, data.replace(day=1), origem, categoria_id)]
+    delta[0] += Decimal(str(valor))
+    delta[1] += quantidade
+
+def _insert_upsert(dialect_name):
+    return pg_insert if dialect_name == 'postgresql' else sqlite_insert
+
+def aplicar_deltas(deltas, session=None):
+    # Um único INSERT ... ON CONFLICT DO UPDATE somando os deltas às linhas existentes
+    linhas = [
+        {'usuario_id': usuario_id, 'mes': mes, 'origem': origem, 'categoria_id': categoria_id,
+         'valor_total': valor, 'quantidade': quantidade}
+        for (usuario_id, mes, origem, categoria_id), (valor, quantidade) in deltas.items()
+        if valor or quantidade
+    ]
+    if not linhas:
+        return
+
+    connection = (session or db.session).connection()
+    tabela = FatoMensal.__table__
+    stmt = _insert_upsert(connection.dialect.name)(tabela).values(linhas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[tabela.c.usuario_id, tabela.c.mes, tabela.c.origem, tabela.c.categoria_id],
+        set_={
+            'valor_total': tabela.c.valor_total + stmt.excluded.valor_total,
+            'quantidade': tabela.c.quantidade + stmt.excluded.quantidade
+        }
+    )
+    connection.execute(stmt)
+    # Linhas que ficaram sem lançamentos não impedem a exclusão do usuário
+    connection.execute(delete(tabela).where(
+        tabela.c.usuario_id.in_({linha['usuario_id'] for linha in linhas}),
+        tabela.c.quantidade <= 0
+    ))
+
+def _valor_atual(obj, atributo):
+    return getattr(obj, atributo)
+
+def _valor_anterior(obj, atributo):
+    historico = inspect(obj).attrs[atributo].history
+    if historico.deleted:
+        return historico.deleted[0]
+    return getattr(obj, atributo)
+
+def _campos(obj, valor_de):
+    # (origem, usuario_id, data, categoria_id, valor) de um objeto ORM, ou None se não for uma origem
+    if isinstance(obj, ContaMovimento):
+        return ('conta_movimento', valor_de(obj, 'usuario_id'), valor_de(obj, 'data'),
+                valor_de(obj, 'conta_transacao_id'), valor_de(obj, 'valor'))
+    if isinstance(obj, CrediarioParcela):
+        movimento = obj.crediario_movimento
+        return ('crediario_parcela', movimento.usuario_id, valor_de(obj, 'vencimento'),
+                movimento.crediario_grupo_id, valor_de(obj, 'valor_parcela'))
+    if isinstance(obj, FinanciamentoParcela):
+        return ('financiamento_parcela', obj.financiamento.usuario_id, valor_de(obj, 'data_vencimento'),
+                valor_de(obj, 'financiamento_id'), valor_de(obj, 'valor_total_previsto'))
+    if isinstance(obj, DespesaFixa):
+        return ('despesa_fixa', valor_de(obj, 'usuario_id'), valor_de(obj, 'mes_ano'),
+                valor_de(obj, 'despesa_receita_id'), valor_de(obj, 'valor'))
+    if isinstance(obj, RendaMovimento):
+        return ('renda_movimento', valor_de(obj, 'usuario_id'), valor_de(obj, 'mes_pagto'),
+                valor_de(obj, 'renda_id'), valor_de(obj, 'valor'))
+    return None
+
+def _somar_campos(deltas, campos, sinal):
+    origem, usuario_id, data, categoria_id, valor = campos
+    somar(deltas, usuario_id, data, origem, categoria_id, sinal * Decimal(str(valor)), sinal)
+
+@event.listens_for(Session, 'before_flush')
+def _contabilizar_flush(session, flush_context, instances):
+    deltas = novos_deltas()
+    with session.no_autoflush:
+        for obj in session.new:
+            campos = _campos(obj, _valor_atual)
+            if campos:
+                _somar_campos(deltas, campos, 1)
+        for obj in session.deleted:
+            campos = _campos(obj, _valor_anterior)
+            if campos:
+                _somar_campos(deltas, campos, -1)
+        for obj in session.dirty:
+            if not session.is_modified(obj):
+                continue
+            antes = _campos(obj, _valor_anterior)
+            if antes is None:
+                continue
+            depois = _campos(obj, _valor_atual)
+            if antes != depois:
+                _somar_campos(deltas, antes, -1)
+                _somar_campos(deltas, depois, 1)
+    aplicar_deltas(deltas, session)
+
+def _fatos_agregados(origem, usuario_ids=None, categoria_id=None):
+    fonte = FONTES[origem]
+    ano = extract('year', fonte.data)
+    mes = extract('month', fonte.data)
+    query = select(fonte.usuario, ano, mes, fonte.categoria, func.sum(fonte.valor), func.count()).select_from(fonte.modelo)
+    if fonte.juncao is not None:
+        query = query.join(*fonte.juncao)
+    if usuario_ids is not None:
+        query = query.where(fonte.usuario.in_(usuario_ids))
+    if categoria_id is not None:
+        query = query.where(fonte.categoria == categoria_id)
+    query = query.group_by(fonte.usuario, ano, mes, fonte.categoria)
+
+    return [
+        {'usuario_id': usuario_id, 'mes': date(int(ano_fato), int(mes_fato), 1), 'origem': origem,
+         'categoria_id': categoria, 'valor_total': valor or Decimal('0.00'), 'quantidade': quantidade}
+        for usuario_id, ano_fato, mes_fato, categoria, valor, quantidade in db.session.execute(query)
+    ]
+
+def recalcular_fatos(origem, usuario_id, categoria_id):
+    # Refaz as linhas de uma categoria a partir da origem (usado após gravações em lote fora do ORM)
+    db.session.execute(delete(FatoMensal).where(
+        FatoMensal.usuario_id == usuario_id,
+        FatoMensal.origem == origem,
+        FatoMensal.categoria_id == categoria_id
+    ))
+    fatos = _fatos_agregados(origem, [usuario_id], categoria_id)
+    if fatos:
+        db.session.execute(FatoMensal.__table__.insert(), fatos)
+
+def reconstruir_fatos_mensais(usuario_ids=None):
+    delete_stmt = delete(FatoMensal)
+    if usuario_ids is not None:
+        delete_stmt = delete_stmt.where(FatoMensal.usuario_id.in_(usuario_ids))
+    db.session.execute(delete_stmt)
+
+    total = 0
+    for origem in FONTES:
+        fatos = _fatos_agregados(origem, usuario_ids)
+        if fatos:
+            db.session.execute(FatoMensal.__table__.insert(), fatos)
+        total += len(fatos)
+    return total
+
+@click.command('rebuild-fatos-mensais')
+@click.option('--usuario-id', type=int, multiple=True, help='Reconstrói apenas os usuários informados.')
+@with_appcontext
+def rebuild_fatos_mensais_command(usuario_id):
+    """Recalcula a tabela fato_mensal a partir dos lançamentos existentes."""
+    total = reconstruir_fatos_mensais(list(usuario_id) or None)
+    db.session.commit()
+    click.echo(f"{total} linhas de fatos mensais gravadas.")
@@ -0,0 +1,33 @@
+# app/services/gravacao_lote_service.py
+import csv
+import io
+from app import db
+from sqlalchemy import insert
+
+# Gravação de muitas linhas sem retorno de ids, usada pela importação de parcelas e pelo "flask seed":
+# COPY no PostgreSQL/psycopg2, INSERT em lote nos demais bancos. Não faz commit.
+
+def suporta_copy(connection):
+    return connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2'
+
+def gravar_linhas(modelo, linhas):
+    # Todas as linhas têm as mesmas chaves, que são colunas da tabela do modelo
+    if not linhas:
+        return
+    connection = db.session.connection()
+    if not suporta_copy(connection):
+        db.session.execute(insert(modelo), linhas)
+        return
+    colunas = list(linhas[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for linha in linhas:
+        # Campo vazio sem aspas é NULL no COPY em formato csv
+        writer.writerow(['' if linha[coluna] is None else linha[coluna] for coluna in colunas])
+    buffer.seek(0)
+    # O cursor bruto usa a mesma conexão (e transação) da sessão
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {modelo.__tablename__} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
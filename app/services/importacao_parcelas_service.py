@@ -0,0 +1,117 @@
+# app/services/importacao_parcelas_service.py
+import csv
+import io
+from app import db
+from app.models.financiamento_parcela_model import FinanciamentoParcela
+from app.services.fato_mensal_service import recalcular_fatos
+from app.services.gravacao_lote_service import gravar_linhas
+from sqlalchemy import select
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+# Importação de parcelas de financiamento em fluxo: o arquivo é lido linha a linha,
+# as parcelas existentes são buscadas em uma única consulta e as válidas são gravadas em lotes
+# (COPY no PostgreSQL/psycopg2, INSERT com várias linhas nos demais bancos).
+
+CABECALHO_OBRIGATORIO = ['numero_parcela', 'data_vencimento', 'valor_principal', 'valor_juros', 'valor_seguro', 'valor_taxas', 'valor_total_previsto']
+TAMANHO_LOTE = 500
+
+def abrir_csv(file_storage):
+    # Decodifica o upload sob demanda, sem carregar o arquivo inteiro em memória
+    stream = io.TextIOWrapper(file_storage.stream, encoding='utf-8-sig', newline='')
+    return csv.reader(stream)
+
+def _decimal(valor_str):
+    return Decimal(valor_str.strip().replace(',', '.'))
+
+def _validar_linha(financiamento_id, numero_linha, row_dict, agora):
+    # Retorna (parcela, None) ou (None, mensagem de erro)
+    try:
+        numero_parcela = int(row_dict['numero_parcela'])
+    except (KeyError, ValueError):
+        return None, f"Linha {numero_linha}: Número da parcela inválido."
+
+    data_vencimento_str = row_dict.get('data_vencimento', '')
+    try:
+        data_vencimento = datetime.strptime(data_vencimento_str, '%Y-%m-%d').date()
+    except ValueError:
+        return None, f"Linha {numero_linha}: Formato de Data de Vencimento inválido '{data_vencimento_str}'. Use YYYY-MM-DD."
+
+    try:
+        valor_principal = _decimal(row_dict['valor_principal'])
+        valor_juros = _decimal(row_dict['valor_juros'])
+        valor_seguro = _decimal(row_dict.get('valor_seguro') or '0.00') # Opcional
+        valor_taxas = _decimal(row_dict.get('valor_taxas') or '0.00') # Opcional
+        valor_total_previsto = _decimal(row_dict['valor_total_previsto'])
+    except (KeyError, InvalidOperation):
+        return None, f"Linha {numero_linha}: Valores numéricos inválidos."
+
+    # Decimal aceita 'NaN' e 'Infinity', que a coluna numérica não guarda
+    if not all(valor.is_finite() for valor in (valor_principal, valor_juros, valor_seguro, valor_taxas, valor_total_previsto)):
+        return None, f"Linha {numero_linha}: Valores numéricos inválidos."
+
+    if valor_principal < 0 or valor_juros < 0 or valor_seguro < 0 or valor_taxas < 0 or valor_total_previsto <= 0:
+        return None, f"Linha {numero_linha}: Valores numéricos devem ser positivos e Valor Total Previsto maior que zero."
+
+    return {
+        'financiamento_id': financiamento_id,
+        'numero_parcela': numero_parcela,
+        'data_vencimento': data_vencimento,
+        'valor_principal': valor_principal,
+        'valor_juros': valor_juros,
+        'valor_seguro': valor_seguro,
+        'valor_taxas': valor_taxas,
+        'valor_total_previsto': valor_total_previsto,
+        'status': 'A Pagar', # Status inicial ao importar
+        'data_criacao': agora
+    }, None
+
+def gravar_lote(parcelas):
+    gravar_linhas(FinanciamentoParcela, parcelas)
+
+def importar_parcelas(financiamento, header, csv_reader, tamanho_lote=TAMANHO_LOTE):
+    # Não faz commit: a rota decide se confirma ou desfaz a importação inteira
+    existentes = set(db.session.scalars(
+        select(FinanciamentoParcela.numero_parcela).where(FinanciamentoParcela.financiamento_id == financiamento.id)
+    ))
+    no_arquivo = set()
+
+    imported_count = 0
+    errors = []
+    lote = []
+    agora = datetime.utcnow()
+
+    try:
+        for i, row in enumerate(csv_reader):
+            numero_linha = i + 2 # +1 do cabeçalho, +1 por começar em zero
+            if not any(campo.strip() for campo in row):
+                continue
+
+            parcela, erro = _validar_linha(financiamento.id, numero_linha, dict(zip(header, row)), agora)
+            if erro:
+                errors.append(erro)
+                continue
+
+            numero_parcela = parcela['numero_parcela']
+            if numero_parcela in existentes:
+                errors.append(f"Linha {numero_linha}: Parcela {numero_parcela} para este financiamento já existe. Pulando.")
+                continue
+            if numero_parcela in no_arquivo:
+                errors.append(f"Linha {numero_linha}: Parcela {numero_parcela} repetida no arquivo. Pulando.")
+                continue
+            no_arquivo.add(numero_parcela)
+
+            lote.append(parcela)
+            if len(lote) >= tamanho_lote:
+                gravar_lote(lote)
+                imported_count += len(lote)
+                lote = []
+    except UnicodeDecodeError:
+        errors.append("O arquivo não está codificado em UTF-8. Nenhuma linha após o erro foi processada.")
+
+    gravar_lote(lote)
+    imported_count += len(lote)
+    if imported_count:
+        # COPY/INSERT em lote não passam pelo before_flush
+        recalcular_fatos('financiamento_parcela', financiamento.usuario_id, financiamento.id)
+    return imported_count, errors
@@ -0,0 +1,195 @@
+# app/services/indices_service.py
+import click
+from flask.cli import AppGroup
+from app import db
+from app.models.conta_model import Conta
+from app.models.conta_movimento_model import ContaMovimento
+from app.models.conta_saldo_mensal_model import ContaSaldoMensal
+from app.models.crediario_model import Crediario
+from app.models.crediario_movimento_model import CrediarioMovimento
+from app.models.financiamento_model import Financiamento
+from app.models.financiamento_parcela_model import FinanciamentoParcela
+from app.models.renda_movimento_model import RendaMovimento
+from app.models.despesa_fixa_model import DespesaFixa
+from app.models.usuario_model import Usuario
+from app.services.dashboard_service import consulta_resumo_mes
+from app.services.extrato_bancario_service import consulta_movimentos_do_mes
+from app.services.extrato_crediario_service import consulta_extrato
+from sqlalchemy import func, select, text
+from sqlalchemy.schema import CreateIndex
+from collections import namedtuple
+from dateutil.relativedelta import relativedelta
+
+# Índices declarados nos modelos e verificação dos planos das consultas mais frequentes (PostgreSQL).
+# "flask indices verificar-planos" roda EXPLAIN com as configurações normais do planejador sobre dados
+# semeados ("flask seed") e confere, para cada consulta, qual índice atende cada tabela grande.
+# Sai com código 1 se uma tabela for lida por Seq Scan ou por um índice diferente do esperado (uso em CI):
+#
+#   flask seed --usuarios 1000 --movimentos 200 --compras 30 --meses 24
+#   flask indices verificar-planos
+
+POR_PAGINA = 51
+# Com poucos dados o planejador prefere, com razão, ler a tabela inteira: o resultado não diria nada
+MINIMO_USUARIOS = 1000
+
+# Parâmetros reais das consultas, tirados de um usuário semeado
+Amostra = namedtuple('Amostra', ['usuario_id', 'email', 'conta_id', 'crediario_id', 'financiamento_id', 'mes', 'proximo_mes'])
+
+def _primeira_pagina(modelo, usuario_id, *ordem):
+    # Mesma forma da listagem paginada por cursor (ver utils/pagination.py)
+    return select(modelo.id).where(modelo.usuario_id == usuario_id).order_by(*[coluna.desc() for coluna in ordem]).limit(POR_PAGINA)
+
+PARCELAS_CREDIARIO = {'ix_crediario_parcela_vencimento', '_crediario_movimento_parcela_uc'}
+PARCELAS_FINANCIAMENTO = {'_financiamento_parcela_uc', 'ix_financiamento_parcela_vencimento'}
+
+# nome -> (consulta(amostra), {tabela: índices aceitos})
+CONSULTAS_QUENTES = {
+    'extrato_bancario': (
+        lambda a: consulta_movimentos_do_mes(a.conta_id, a.mes, a.proximo_mes, 0).statement,
+        {'conta_movimento': {'ix_conta_movimento_conta_data'}}),
+    'saldo_anterior_ao_mes': (
+        lambda a: select(ContaSaldoMensal.saldo_acumulado).where(
+            ContaSaldoMensal.conta_id == a.conta_id, ContaSaldoMensal.mes < a.mes
+        ).order_by(ContaSaldoMensal.mes.desc()).limit(1),
+        {'conta_saldo_mensal': {'_conta_saldo_mensal_uc'}}),
+    'extrato_crediario_todos': (
+        lambda a: consulta_extrato(a.usuario_id, 'all', a.mes, a.proximo_mes).statement,
+        {'crediario_parcela': PARCELAS_CREDIARIO}),
+    'extrato_crediario_um': (
+        lambda a: consulta_extrato(a.usuario_id, a.crediario_id, a.mes, a.proximo_mes).statement,
+        {'crediario_parcela': PARCELAS_CREDIARIO}),
+    'parcelas_financiamento': (
+        lambda a: select(FinanciamentoParcela.id).where(
+            FinanciamentoParcela.financiamento_id == a.financiamento_id
+        ).order_by(FinanciamentoParcela.numero_parcela),
+        {'financiamento_parcela': PARCELAS_FINANCIAMENTO}),
+    'resumo_dashboard': (
+        lambda a: consulta_resumo_mes(a.usuario_id, a.mes, a.proximo_mes),
+        {'conta_saldo_mensal': {'_conta_saldo_mensal_uc'},
+         'crediario_parcela': PARCELAS_CREDIARIO,
+         'financiamento_parcela': PARCELAS_FINANCIAMENTO,
+         'despesa_fixa': {'ix_despesa_fixa_usuario_mes'},
+         'renda_movimento': {'ix_renda_movimento_usuario_mes_pagto'}}),
+    'lista_conta_movimentos': (
+        lambda a: _primeira_pagina(ContaMovimento, a.usuario_id, ContaMovimento.data, ContaMovimento.data_criacao, ContaMovimento.id),
+        {'conta_movimento': {'ix_conta_movimento_usuario_data'}}),
+    'lista_crediario_movimentos': (
+        lambda a: _primeira_pagina(CrediarioMovimento, a.usuario_id,
+                                   CrediarioMovimento.data_compra, CrediarioMovimento.data_criacao, CrediarioMovimento.id),
+        {'crediario_movimento': {'ix_crediario_movimento_usuario_data'}}),
+    'lista_renda_movimentos': (
+        lambda a: _primeira_pagina(RendaMovimento, a.usuario_id, RendaMovimento.mes_ref, RendaMovimento.mes_pagto, RendaMovimento.id),
+        {'renda_movimento': {'ix_renda_movimento_usuario_mes_ref'}}),
+    'lista_despesas_fixas': (
+        lambda a: _primeira_pagina(DespesaFixa, a.usuario_id, DespesaFixa.mes_ano, DespesaFixa.id),
+        {'despesa_fixa': {'ix_despesa_fixa_usuario_mes'}}),
+    'login_por_email': (
+        lambda a: select(Usuario.id).where(func.lower(Usuario.email) == a.email.lower()),
+        {'usuario': {'ix_usuario_email_lower'}}),
+}
+
+def obter_amostra():
+    # Um usuário com financiamento (os semeados têm todos os cadastros) e o último mês com movimentos da conta
+    usuario_id = db.session.scalar(select(Financiamento.usuario_id).order_by(Financiamento.id).limit(1))
+    if usuario_id is None:
+        return None
+    conta_id = db.session.scalar(select(Conta.id).where(Conta.usuario_id == usuario_id).order_by(Conta.id).limit(1))
+    crediario_id = db.session.scalar(select(Crediario.id).where(Crediario.usuario_id == usuario_id).order_by(Crediario.id).limit(1))
+    financiamento_id = db.session.scalar(
+        select(Financiamento.id).where(Financiamento.usuario_id == usuario_id).order_by(Financiamento.id).limit(1))
+    ultimo = db.session.scalar(select(func.max(ContaMovimento.data)).where(ContaMovimento.conta_id == conta_id))
+    if None in (conta_id, crediario_id, ultimo):
+        return None
+    mes = ultimo.replace(day=1)
+    email = db.session.scalar(select(Usuario.email).where(Usuario.id == usuario_id))
+    return Amostra(usuario_id, email, conta_id, crediario_id, financiamento_id, mes, mes + relativedelta(months=1))
+
+def explicar(stmt):
+    conexao = db.session.connection()
+    compilado = stmt.compile(dialect=conexao.dialect)
+    return conexao.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compilado}', compilado.params).scalar()[0]['Plan']
+
+def nos_do_plano(plano):
+    yield plano
+    for filho in plano.get('Plans', []):
+        yield from nos_do_plano(filho)
+
+def varreduras_sequenciais(plano):
+    return sorted({no['Relation Name'] for no in nos_do_plano(plano) if no['Node Type'] == 'Seq Scan'})
+
+def indices_usados(plano):
+    # Bitmap Index Scan traz só o nome do índice; Index Scan e Index Only Scan, também a tabela
+    return {no['Index Name'] for no in nos_do_plano(plano) if 'Index Name' in no}
+
+def problemas_do_plano(plano, esperados):
+    sequenciais = set(varreduras_sequenciais(plano))
+    usados = indices_usados(plano)
+    problemas = []
+    for tabela, aceitos in esperados.items():
+        if tabela in sequenciais:
+            problemas.append(f"Seq Scan em {tabela}")
+        elif not usados & aceitos:
+            problemas.append(f"{tabela} sem {' ou '.join(sorted(aceitos))}")
+    return problemas
+
+def resumo_do_plano(plano, nivel=0):
+    linhas = [f"{'  ' * nivel}{plano['Node Type']}"
+              + (f" em {plano['Relation Name']}" if 'Relation Name' in plano else '')
+              + (f" ({plano['Index Name']})" if 'Index Name' in plano else '')]
+    for filho in plano.get('Plans', []):
+        linhas.extend(resumo_do_plano(filho, nivel + 1))
+    return linhas
+
+def indices_declarados():
+    return [indice for tabela in db.metadata.sorted_tables for indice in sorted(tabela.indexes, key=lambda indice: indice.name)]
+
+indices_cli = AppGroup('indices', help='Índices das tabelas e verificação dos planos de consulta.')
+
+@indices_cli.command('criar')
+def criar_command():
+    """Cria os índices declarados nos modelos que ainda não existem no banco.
+
+    db.create_all() não altera tabelas existentes; use este comando depois de atualizar um banco já criado.
+    """
+    conexao = db.session.connection()
+    for indice in indices_declarados():
+        conexao.execute(CreateIndex(indice, if_not_exists=True))
+    db.session.commit()
+    click.echo(f"{len(indices_declarados())} índices verificados/criados.")
+
+@indices_cli.command('verificar-planos')
+@click.option('--detalhes', is_flag=True, help='Mostra a árvore de cada plano.')
+def verificar_planos_command(detalhes):
+    """Roda EXPLAIN nas consultas frequentes sobre dados semeados e falha se alguma não usar o índice esperado."""
+    if db.engine.dialect.name != 'postgresql':
+        click.echo("A verificação de planos requer PostgreSQL.", err=True)
+        raise SystemExit(1)
+
+    usuarios = db.session.scalar(select(func.count()).select_from(Usuario))
+    amostra = obter_amostra()
+    if usuarios < MINIMO_USUARIOS or amostra is None:
+        click.echo(f"Dados insuficientes ({usuarios} usuários; mínimo {MINIMO_USUARIOS}, com contas, crediários e "
+                   f"financiamentos). Semeie antes com \"flask seed\".", err=True)
+        raise SystemExit(1)
+
+    # Estatísticas atualizadas: logo após uma carga o planejador ainda não conhece o volume das tabelas
+    tabelas = sorted({tabela for _, esperados in CONSULTAS_QUENTES.values() for tabela in esperados})
+    db.session.execute(text(f"ANALYZE {', '.join(tabelas)}"))
+    db.session.commit()
+
+    falhas = {}
+    try:
+        for nome, (consulta, esperados) in CONSULTAS_QUENTES.items():
+            plano = explicar(consulta(amostra))
+            problemas = problemas_do_plano(plano, esperados)
+            click.echo(f"{nome:<28} {'; '.join(problemas) if problemas else 'ok (' + ', '.join(sorted(indices_usados(plano))) + ')'}")
+            if detalhes:
+                click.echo('\n'.join('    ' + linha for linha in resumo_do_plano(plano)))
+            if problemas:
+                falhas[nome] = problemas
+    finally:
+        db.session.rollback()
+
+    if falhas:
+        click.echo(f"{len(falhas)} consultas sem o índice esperado: {', '.join(falhas)}", err=True)
+        raise SystemExit(1)
@@ -0,0 +1,124 @@
+# app/services/limitador_login.py
+import threading
+import time
+from collections import Counter, OrderedDict
+
+# Limite de tentativas de login por token bucket, por IP e por login_id. A verificação acontece
+# antes de qualquer consulta ao banco e do check_password_hash, que é caro de propósito:
+# uma rajada de tentativas é recusada sem consumir CPU dos workers.
+# O balde do login é por (IP, login) e só gasta token com senha errada: tentativas de terceiros
+# não bloqueiam o dono da conta, que entra de outro endereço, nem logins bem-sucedidos contam.
+# Por padrão os baldes ficam na memória do processo; com LOGIN_LIMITE_REDIS_URL são compartilhados.
+
+MAX_BALDES_MEMORIA = 10000
+
+def parse_limite(valor):
+    # "20/60" -> 20 tentativas a cada 60 segundos: capacidade 20, reposição de 20/60 tokens por segundo
+    if not valor:
+        return None
+    capacidade, periodo = str(valor).split('/')
+    capacidade, periodo = int(capacidade), float(periodo)
+    if capacidade <= 0:
+        return None
+    return capacidade, capacidade / periodo
+
+class BaldesMemoria:
+    def __init__(self, max_baldes=MAX_BALDES_MEMORIA):
+        self._baldes = OrderedDict() # chave -> (tokens, atualizado_em)
+        self._lock = threading.Lock()
+        self._max_baldes = max_baldes
+
+    def consumir(self, chave, capacidade, taxa, custo=1):
+        # custo=0 só consulta se há token disponível
+        agora = time.monotonic()
+        with self._lock:
+            tokens, atualizado_em = self._baldes.get(chave, (capacidade, agora))
+            tokens = min(capacidade, tokens + (agora - atualizado_em) * taxa)
+            permitido = tokens >= 1
+            if permitido:
+                tokens -= custo
+            self._baldes[chave] = (tokens, agora)
+            self._baldes.move_to_end(chave)
+            # Baldes descartados voltam cheios; os mais antigos são os que já tiveram tempo de encher
+            while len(self._baldes) > self._max_baldes:
+                self._baldes.popitem(last=False)
+        return permitido
+
+class BaldesRedis:
+    # Leitura, reposição e consumo numa única operação atômica no servidor
+    SCRIPT = """
+        local capacidade = tonumber(ARGV[1])
+        local taxa = tonumber(ARGV[2])
+        local agora = tonumber(ARGV[3])
+        local custo = tonumber(ARGV[4])
+        local dados = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+        local tokens = tonumber(dados[1]) or capacidade
+        local ts = tonumber(dados[2]) or agora
+        tokens = math.min(capacidade, tokens + math.max(0, agora - ts) * taxa)
+        local permitido = 0
+        if tokens >= 1 then
+            tokens = tokens - custo
+            permitido = 1
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(agora))
+        redis.call('EXPIRE', KEYS[1], math.ceil(capacidade / taxa) + 1)
+        return permitido
+    """
+
+    def __init__(self, url, prefixo='web_fin:login:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("LOGIN_LIMITE_REDIS_URL configurado, mas o pacote 'redis' não está instalado.")
+        self._cliente = redis.Redis.from_url(url)
+        self._script = self._cliente.register_script(self.SCRIPT)
+        self._prefixo = prefixo
+
+    def consumir(self, chave, capacidade, taxa, custo=1):
+        return bool(self._script(keys=[self._prefixo + chave], args=[capacidade, taxa, time.time(), custo]))
+
+class LimitadorLogin:
+    def __init__(self):
+        self.limite_ip = None
+        self.limite_login = None
+        self.baldes = None
+        self.contadores = Counter()
+
+    def init_app(self, app):
+        app.config.setdefault('LOGIN_LIMITE_IP', '20/60')
+        app.config.setdefault('LOGIN_LIMITE_LOGIN', '5/60')
+        app.config.setdefault('LOGIN_LIMITE_REDIS_URL', None)
+        self.limite_ip = parse_limite(app.config['LOGIN_LIMITE_IP'])
+        self.limite_login = parse_limite(app.config['LOGIN_LIMITE_LOGIN'])
+        if app.config['LOGIN_LIMITE_REDIS_URL']:
+            self.baldes = BaldesRedis(app.config['LOGIN_LIMITE_REDIS_URL'])
+        else:
+            self.baldes = BaldesMemoria()
+
+    def _chave_login(self, ip_address, login_id):
+        # Mesma normalização da busca do usuário: e-mails não diferenciam maiúsculas, logins sim
+        login_id = (login_id or '').strip()
+        if not login_id:
+            return None
+        if '@' in login_id:
+            login_id = login_id.lower()
+        return f'login:{ip_address}:{login_id}'
+
+    def permitir(self, ip_address, login_id):
+        if self.limite_ip and not self.baldes.consumir(f'ip:{ip_address}', *self.limite_ip):
+            self.contadores['bloqueadas_ip'] += 1
+            return False
+        chave = self._chave_login(ip_address, login_id)
+        if self.limite_login and chave and not self.baldes.consumir(chave, *self.limite_login, custo=0):
+            self.contadores['bloqueadas_login'] += 1
+            return False
+        self.contadores['permitidas'] += 1
+        return True
+
+    def registrar_falha(self, ip_address, login_id):
+        # Chamada depois de uma senha errada
+        chave = self._chave_login(ip_address, login_id)
+        if self.limite_login and chave:
+            self.baldes.consumir(chave, *self.limite_login)
+
+limitador_login = LimitadorLogin()
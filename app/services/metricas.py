@@ -0,0 +1,260 @@
+# app/services/metricas.py
+import atexit
+import glob
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from flask import Response, abort, current_app, g, request
+from app import db
+from app.services.audit_sink import audit_sink
+from app.services.cache_resultados import cache_resultados
+from app.services.limitador_login import limitador_login
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Métricas no formato texto do Prometheus em /metrics: latência das requisições por endpoint,
+# comandos SQL, pool de conexões, eventos de auditoria, tentativas de login e cache de resultados.
+# Cada processo acumula os valores em memória (só somas sob um lock no caminho da requisição).
+# Com METRICAS_DIR, cada worker grava periodicamente um retrato dos seus valores num arquivo próprio
+# e /metrics soma os arquivos de todos os workers, qualquer que seja o worker que atende a coleta.
+
+BUCKETS_REQUISICAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_SQL = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+# nome -> (tipo, descrição, labels, buckets)
+DEFINICOES = {
+    'web_fin_requisicoes_total': ('counter', 'Requisições atendidas.', ('endpoint', 'metodo', 'status'), None),
+    'web_fin_requisicao_segundos': ('histogram', 'Tempo de resposta das requisições.', ('endpoint', 'metodo'), BUCKETS_REQUISICAO),
+    'web_fin_sql_segundos': ('histogram', 'Duração dos comandos SQL (_count é o número de comandos).', ('operacao',), BUCKETS_SQL),
+    'web_fin_auditoria_eventos_total': ('counter', 'Eventos de auditoria gravados.', ('event_type',), None),
+    'web_fin_login_tentativas_total': ('counter', 'Tentativas de login pelo limitador.', ('resultado',), None),
+    'web_fin_cache_resultados_total': ('counter', 'Consultas ao cache de resultados.', ('namespace', 'resultado'), None),
+    'web_fin_cache_resultados_itens': ('gauge', 'Itens no cache de resultados em memória (backend memoria).', (), None),
+    'web_fin_pool_conexoes_em_uso': ('gauge', 'Conexões do pool em uso.', (), None),
+    'web_fin_pool_conexoes_excedentes': ('gauge', 'Conexões abertas além do tamanho do pool (overflow).', (), None),
+    'web_fin_pool_tamanho': ('gauge', 'Tamanho configurado do pool de conexões.', (), None),
+    'web_fin_processos': ('gauge', 'Processos com métricas recentes.', (), None),
+}
+
+OPERACOES_SQL = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'COPY', 'WITH'}
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _rotulos(nomes, valores, extra=''):
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+class Metricas:
+    def __init__(self):
+        self.app = None
+        self.diretorio = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self._arquivo = None
+        self._thread = None
+        self._zerar()
+
+    def _zerar(self):
+        self.contadores = Counter() # (nome, labels) -> valor
+        self.histogramas = {} # (nome, labels) -> [contagens por bucket + Inf, soma]
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('METRICAS_DIR', None)
+        app.config.setdefault('METRICAS_INTERVALO', 10)
+        app.config.setdefault('METRICAS_TOKEN', None)
+        self.diretorio = app.config['METRICAS_DIR']
+        if self.diretorio:
+            os.makedirs(self.diretorio, exist_ok=True)
+            atexit.register(self._gravar, True)
+
+        app.before_request(self._iniciar_requisicao)
+        app.after_request(self._registrar_requisicao)
+        app.add_url_rule('/metrics', 'metricas', self._exportar)
+
+    def incrementar(self, nome, labels=(), valor=1):
+        with self._lock:
+            self.contadores[(nome, labels)] += valor
+
+    def observar(self, nome, labels, valor):
+        indice = bisect_left(DEFINICOES[nome][3], valor)
+        with self._lock:
+            histograma = self.histogramas.get((nome, labels))
+            if histograma is None:
+                histograma = self.histogramas[(nome, labels)] = [[0] * (len(DEFINICOES[nome][3]) + 1), 0.0]
+            histograma[0][indice] += 1
+            histograma[1] += valor
+
+    def _garantir_processo(self):
+        # Após um fork (ex.: gunicorn --preload) o filho recomeça do zero, com arquivo e thread próprios
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._zerar()
+            self._pid = os.getpid()
+            if self.diretorio:
+                self._arquivo = os.path.join(self.diretorio, f'{self._pid}-{int(time.time() * 1000)}.json')
+                self._thread = threading.Thread(target=self._gravar_periodicamente, name='metricas', daemon=True)
+                self._thread.start()
+
+    def _iniciar_requisicao(self):
+        self._garantir_processo()
+        g._metricas_inicio = time.perf_counter()
+
+    def _registrar_requisicao(self, response):
+        inicio = g.pop('_metricas_inicio', None)
+        if inicio is not None:
+            endpoint = request.endpoint or 'sem_rota'
+            self.incrementar('web_fin_requisicoes_total', (endpoint, request.method, str(response.status_code)))
+            self.observar('web_fin_requisicao_segundos', (endpoint, request.method), time.perf_counter() - inicio)
+        return response
+
+    def _valores_coletados(self):
+        # Valores mantidos por outros serviços, lidos só na coleta
+        contadores = Counter()
+        for tipo, valor in audit_sink.contadores.items():
+            contadores[('web_fin_auditoria_eventos_total', (tipo,))] = valor
+        for resultado, valor in limitador_login.contadores.items():
+            contadores[('web_fin_login_tentativas_total', (resultado,))] = valor
+        for chave, valor in cache_resultados.contadores.items():
+            namespace, _, resultado = chave.rpartition('_')
+            contadores[('web_fin_cache_resultados_total', (namespace, resultado))] = valor
+
+        gauges = Counter({('web_fin_processos', ()): 1})
+        # Só o cache em memória do processo: contar o backend compartilhado varreria o Redis a cada
+        # retrato, e a soma entre os workers multiplicaria o total
+        if cache_resultados.local:
+            gauges[('web_fin_cache_resultados_itens', ())] = len(cache_resultados.backend)
+        with self.app.app_context():
+            pool = db.engine.pool
+        if hasattr(pool, 'checkedout'):
+            gauges[('web_fin_pool_conexoes_em_uso', ())] = pool.checkedout()
+        if hasattr(pool, 'overflow'):
+            gauges[('web_fin_pool_conexoes_excedentes', ())] = max(pool.overflow(), 0)
+            gauges[('web_fin_pool_tamanho', ())] = pool.size()
+        return contadores, gauges
+
+    def _retrato(self):
+        contadores, gauges = self._valores_coletados()
+        with self._lock:
+            contadores.update(self.contadores)
+            histogramas = {chave: [list(contagens), soma] for chave, (contagens, soma) in self.histogramas.items()}
+        return contadores, histogramas, gauges
+
+    def _gravar(self, final=False):
+        if not self._arquivo or self._pid != os.getpid():
+            return
+        try:
+            contadores, histogramas, gauges = self._retrato()
+            dados = {
+                'gravado_em': time.time(),
+                'contadores': [[nome, list(labels), valor] for (nome, labels), valor in contadores.items()],
+                'histogramas': [[nome, list(labels), contagens, soma] for (nome, labels), (contagens, soma) in histogramas.items()],
+                # Ao encerrar, o processo deixa de contar nos gauges (conexões, processos)
+                'gauges': [] if final else [[nome, list(labels), valor] for (nome, labels), valor in gauges.items()],
+            }
+            temporario = f'{self._arquivo}.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(dados, f)
+            os.replace(temporario, self._arquivo)
+        except Exception:
+            logger.exception("Falha ao gravar as métricas em %s", self._arquivo)
+
+    def _gravar_periodicamente(self):
+        while True:
+            time.sleep(self.app.config['METRICAS_INTERVALO'])
+            self._gravar()
+
+    def _somar_outros_processos(self, contadores, histogramas, gauges):
+        # Contadores dos processos encerrados continuam somando (contadores do Prometheus não diminuem);
+        # gauges só valem para arquivos atualizados recentemente
+        validade = 3 * self.app.config['METRICAS_INTERVALO']
+        for caminho in glob.glob(os.path.join(self.diretorio, '*.json')):
+            if caminho == self._arquivo:
+                continue
+            try:
+                with open(caminho, encoding='utf-8') as f:
+                    dados = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for nome, labels, valor in dados['contadores']:
+                contadores[(nome, tuple(labels))] += valor
+            for nome, labels, contagens, soma in dados['histogramas']:
+                atual = histogramas.setdefault((nome, tuple(labels)), [[0] * len(contagens), 0.0])
+                atual[0] = [a + b for a, b in zip(atual[0], contagens)]
+                atual[1] += soma
+            if time.time() - dados['gravado_em'] <= validade:
+                for nome, labels, valor in dados['gauges']:
+                    gauges[(nome, tuple(labels))] += valor
+
+    def texto(self):
+        self._garantir_processo()
+        contadores, histogramas, gauges = self._retrato()
+        if self.diretorio:
+            self._somar_outros_processos(contadores, histogramas, gauges)
+
+        linhas = []
+        for nome, (tipo, ajuda, nomes_labels, buckets) in DEFINICOES.items():
+            linhas.append(f'# HELP {nome} {ajuda}')
+            linhas.append(f'# TYPE {nome} {tipo}')
+            if tipo == 'histogram':
+                for (chave, labels), (contagens, soma) in sorted(histogramas.items()):
+                    if chave != nome:
+                        continue
+                    acumulado = 0
+                    for limite, contagem in zip((*buckets, '+Inf'), contagens):
+                        acumulado += contagem
+                        le = f'le="{limite}"'
+                        linhas.append(f'{nome}_bucket{_rotulos(nomes_labels, labels, le)} {acumulado}')
+                    linhas.append(f'{nome}_sum{_rotulos(nomes_labels, labels)} {_numero(soma)}')
+                    linhas.append(f'{nome}_count{_rotulos(nomes_labels, labels)} {acumulado}')
+            else:
+                valores = contadores if tipo == 'counter' else gauges
+                for (chave, labels), valor in sorted(valores.items()):
+                    if chave == nome:
+                        linhas.append(f'{nome}{_rotulos(nomes_labels, labels)} {_numero(valor)}')
+        return '\n'.join(linhas) + '\n'
+
+    def _autorizado(self):
+        # Sem token configurado a coleta fica fechada: atrás de um proxy reverso todo acesso
+        # chega de localhost, então o endereço de origem não serve para autorizar
+        token = current_app.config['METRICAS_TOKEN']
+        if not token:
+            return False
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+    def _exportar(self):
+        if not self._autorizado():
+            abort(403)
+        return Response(self.texto(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+metricas = Metricas()
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _sql_inicio(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metricas_inicio = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _sql_fim(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, '_metricas_inicio', None)
+    if inicio is None:
+        return
+    partes = statement.split(None, 1)
+    operacao = partes[0].upper() if partes else ''
+    metricas.observar('web_fin_sql_segundos', (operacao if operacao in OPERACOES_SQL else 'OUTRO',), time.perf_counter() - inicio)
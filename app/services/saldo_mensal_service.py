@@ -0,0 +1,117 @@
+# app/services/saldo_mensal_service.py
+import click
+from flask.cli import with_appcontext
+from app import db
+from app.models.conta_saldo_mensal_model import ContaSaldoMensal
+from app.models.conta_movimento_model import ContaMovimento
+from app.models.conta_transacao_model import ContaTransacao
+from sqlalchemy import case, extract, func, insert, select, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+# Os checkpoints guardam, por conta e por mês, o saldo acumulado dos movimentos até o fim do mês.
+# O saldo de abertura de um mês passa a ser o checkpoint mais recente anterior a ele.
+
+# Mesma regra em SQL, para agregações e funções de janela
+valor_com_sinal_sql = case(
+    (ContaTransacao.tipo == 'Crédito', ContaMovimento.valor),
+    (ContaTransacao.tipo == 'Débito', -ContaMovimento.valor),
+    else_=0
+)
+
+CENTAVOS = Decimal('0.01')
+
+def arredondar_centavos(valor):
+    # Mesmo arredondamento da coluna Numeric(12,2) do movimento no PostgreSQL: o checkpoint soma o valor gravado
+    return Decimal(str(valor)).quantize(CENTAVOS, rounding=ROUND_HALF_UP)
+
+def valor_com_sinal(tipo, valor):
+    # Crédito soma, Débito subtrai (mesma regra do extrato)
+    valor = arredondar_centavos(valor)
+    if tipo == 'Crédito':
+        return valor
+    if tipo == 'Débito':
+        return -valor
+    return Decimal('0.00')
+
+def saldo_anterior_ao_mes(conta_id, mes):
+    # Uma única busca indexada em (conta_id, mes)
+    saldo = db.session.query(ContaSaldoMensal.saldo_acumulado).filter(
+        ContaSaldoMensal.conta_id == conta_id,
+        ContaSaldoMensal.mes < mes
+    ).order_by(ContaSaldoMensal.mes.desc()).limit(1).scalar()
+    return saldo if saldo is not None else Decimal('0.00')
+
+def aplicar_movimento(conta_id, data, delta):
+    # Deve ser chamada dentro da mesma transação que grava o movimento
+    if not delta:
+        return
+
+    mes = data.replace(day=1)
+    # Cria o checkpoint do mês com o saldo anterior, se ainda não existir. Com ON CONFLICT DO NOTHING,
+    # dois primeiros movimentos simultâneos no mesmo mês não violam _conta_saldo_mensal_uc:
+    # o segundo espera o primeiro e segue direto para o UPDATE
+    saldo_anterior = select(ContaSaldoMensal.saldo_acumulado).where(
+        ContaSaldoMensal.conta_id == conta_id,
+        ContaSaldoMensal.mes < mes
+    ).order_by(ContaSaldoMensal.mes.desc()).limit(1).scalar_subquery()
+    connection = db.session.connection()
+    insert_mes = pg_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+    connection.execute(insert_mes(ContaSaldoMensal.__table__).values(
+        conta_id=conta_id,
+        mes=mes,
+        saldo_acumulado=func.coalesce(saldo_anterior, 0)
+    ).on_conflict_do_nothing(index_elements=['conta_id', 'mes']))
+
+    # O mês do movimento e todos os posteriores são deslocados pelo mesmo valor
+    db.session.execute(
+        update(ContaSaldoMensal).where(
+            ContaSaldoMensal.conta_id == conta_id,
+            ContaSaldoMensal.mes >= mes
+        ).values(saldo_acumulado=ContaSaldoMensal.saldo_acumulado + delta)
+    )
+
+def reconstruir_saldos_mensais(conta_ids=None):
+    delete_stmt = delete(ContaSaldoMensal)
+    if conta_ids is not None:
+        delete_stmt = delete_stmt.where(ContaSaldoMensal.conta_id.in_(conta_ids))
+    db.session.execute(delete_stmt)
+
+    ano = extract('year', ContaMovimento.data)
+    mes = extract('month', ContaMovimento.data)
+    valor_mes = func.sum(valor_com_sinal_sql)
+    query = db.session.query(ContaMovimento.conta_id, ano, mes, valor_mes).join(
+        ContaTransacao, ContaMovimento.conta_transacao_id == ContaTransacao.id
+    )
+    if conta_ids is not None:
+        query = query.filter(ContaMovimento.conta_id.in_(conta_ids))
+    query = query.group_by(ContaMovimento.conta_id, ano, mes).order_by(ContaMovimento.conta_id, ano, mes)
+
+    checkpoints = []
+    conta_atual = None
+    acumulado = Decimal('0.00')
+    for conta_id, ano_mov, mes_mov, valor in query:
+        if conta_id != conta_atual:
+            conta_atual = conta_id
+            acumulado = Decimal('0.00')
+        acumulado += Decimal(str(valor or 0))
+        checkpoints.append({
+            'conta_id': conta_id,
+            'mes': date(int(ano_mov), int(mes_mov), 1),
+            'saldo_acumulado': acumulado
+        })
+
+    if checkpoints:
+        db.session.execute(insert(ContaSaldoMensal), checkpoints)
+    return len(checkpoints)
+
+@click.command('rebuild-saldos-mensais')
+@click.option('--conta-id', type=int, multiple=True, help='Reconstrói apenas as contas informadas.')
+@with_appcontext
+def rebuild_saldos_mensais_command(conta_id):
+    """Recalcula os checkpoints de saldo mensal a partir dos movimentos existentes."""
+    total = reconstruir_saldos_mensais(list(conta_id) or None)
+    db.session.commit()
+    click.echo(f"{total} checkpoints de saldo mensal gravados.")
@@ -0,0 +1,248 @@
+# app/services/seed_service.py
+import random
+import time
+import click
+from flask.cli import with_appcontext
+from app import db
+from app.models.usuario_model import Usuario
+from app.models.conta_model import Conta, tipo_conta_enum
+from app.models.conta_transacao_model import ContaTransacao
+from app.models.conta_movimento_model import ContaMovimento
+from app.models.crediario_model import Crediario, tipo_crediario_enum
+from app.models.crediario_grupo_model import CrediarioGrupo
+from app.models.crediario_movimento_model import CrediarioMovimento
+from app.models.crediario_parcela_model import CrediarioParcela
+from app.models.financiamento_model import Financiamento
+from app.models.financiamento_parcela_model import FinanciamentoParcela
+from app.models.renda_model import Renda
+from app.models.renda_movimento_model import RendaMovimento
+from app.models.despesa_receita_model import DespesaReceita
+from app.models.despesa_fixa_model import DespesaFixa
+from app.services.amortizacao_service import calcular_tabela
+from app.services.fato_mensal_service import reconstruir_fatos_mensais
+from app.services.gravacao_lote_service import gravar_linhas
+from app.services.saldo_mensal_service import reconstruir_saldos_mensais
+from app.services.senha_service import gerar_hash
+from sqlalchemy import insert, select
+from collections import Counter
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+
+# Gerador de dados sintéticos em volume de produção ("flask seed"). Cada usuário é gerado a partir de
+# random.Random(f"{semente}:{n}"), então o usuário n tem sempre os mesmos dados, qualquer que seja
+# o total pedido; com --ate fixo o resultado é idêntico entre execuções. As linhas são gravadas via
+# Core (COPY no PostgreSQL/psycopg2), sem objetos ORM, e os saldos mensais e fatos mensais são
+# reconstruídos ao final de cada usuário, que é confirmado numa transação própria.
+
+BANCOS = ['BANCO DO BRASIL', 'CAIXA', 'ITAU', 'BRADESCO', 'SANTANDER', 'NUBANK', 'INTER', 'C6 BANK']
+TRANSACOES = [('SALARIO', 'Crédito'), ('PIX RECEBIDO', 'Crédito'), ('RENDIMENTO', 'Crédito'),
+              ('PIX ENVIADO', 'Débito'), ('COMPRA NO DEBITO', 'Débito'), ('BOLETO', 'Débito'),
+              ('TARIFA BANCARIA', 'Débito'), ('SAQUE', 'Débito')]
+LOJAS = ['MAGAZINE', 'CASAS BAHIA', 'AMAZON', 'MERCADO LIVRE', 'RENNER', 'AMERICANAS', 'LEROY MERLIN', 'FARMACIA']
+GRUPOS = ['MERCADO', 'VESTUARIO', 'ELETRONICOS', 'CASA', 'SAUDE', 'LAZER', 'TRANSPORTE', 'EDUCACAO']
+RENDAS = [('SALARIO', 'Provento'), ('VALE ALIMENTACAO', 'Benefício'), ('PLANO DE SAUDE', 'Desconto'),
+          ('IRRF', 'Imposto'), ('DECIMO TERCEIRO', 'Provento'), ('HORA EXTRA', 'Provento')]
+DESPESAS = ['ALUGUEL', 'CONDOMINIO', 'ENERGIA', 'AGUA', 'INTERNET', 'CELULAR', 'ESCOLA', 'ACADEMIA',
+            'STREAMING', 'SEGURO DO CARRO']
+PARCELAMENTOS = [1, 1, 1, 2, 3, 3, 4, 5, 6, 10, 12]
+
+def _valor(rng, minimo, maximo):
+    return Decimal(rng.randint(int(minimo * 100), int(maximo * 100))) / 100
+
+def gravar_com_ids(modelo, linhas):
+    # INSERT ... RETURNING em lote, com os ids na ordem das linhas
+    if not linhas:
+        return []
+    return db.session.execute(insert(modelo).returning(modelo.id, sort_by_parameter_order=True), linhas).scalars().all()
+
+def _momento(rng, dia):
+    return datetime.combine(dia, datetime.min.time()) + timedelta(seconds=rng.randint(6 * 3600, 22 * 3600))
+
+def gerar_usuario(n, semente, volumes, inicio, fim, senha_hash, prefixo):
+    rng = random.Random(f'{semente}:{n}')
+    contagem = Counter()
+    meses = [inicio + relativedelta(months=i) for i in range((fim.year - inicio.year) * 12 + fim.month - inicio.month + 1)]
+    ultimo_dia = fim + relativedelta(months=1) - timedelta(days=1)
+    dias = (ultimo_dia - inicio).days + 1
+
+    def dia_aleatorio():
+        return inicio + timedelta(days=rng.randrange(dias))
+
+    usuario_id = gravar_com_ids(Usuario, [{
+        'nome': f'Usuario Sintetico {n}', 'email': f'{prefixo}{n}@exemplo.com', 'login': f'{prefixo}{n}',
+        'senha_hash': senha_hash, 'is_active': True, 'is_admin': False, 'default_homepage': 'dashboard_bp.dashboard'
+    }])[0]
+    contagem['usuario'] += 1
+
+    contas = gravar_com_ids(Conta, [{
+        'usuario_id': usuario_id, 'nome_banco': BANCOS[i % len(BANCOS)], 'agencia': f'{rng.randint(1, 9999):04d}',
+        'conta': f'{100000 + i}', 'tipo': rng.choice(tipo_conta_enum.enums),
+        'saldo_inicial': _valor(rng, 0, 5000), 'limite': _valor(rng, 0, 2000), 'descricao': None
+    } for i in range(volumes['contas'])])
+    contagem['conta'] += len(contas)
+
+    tipos = TRANSACOES[:volumes['transacoes']]
+    transacoes = gravar_com_ids(ContaTransacao, [
+        {'usuario_id': usuario_id, 'transacao': transacao, 'tipo': tipo, 'descricao': None} for transacao, tipo in tipos
+    ])
+    creditos = [id_ for id_, (_, tipo) in zip(transacoes, tipos) if tipo == 'Crédito']
+    debitos = [id_ for id_, (_, tipo) in zip(transacoes, tipos) if tipo == 'Débito']
+    contagem['conta_transacao'] += len(transacoes)
+
+    if contas and transacoes:
+        movimentos = []
+        for i in range(volumes['movimentos']):
+            credito = not debitos or (creditos and rng.random() < 0.25)
+            dia = dia_aleatorio()
+            movimentos.append({
+                'usuario_id': usuario_id, 'conta_id': rng.choice(contas),
+                'conta_transacao_id': rng.choice(creditos if credito else debitos), 'data': dia,
+                'valor': _valor(rng, 50, 3000) if credito else _valor(rng, 5, 600),
+                'descricao': f'Movimento {i + 1}', 'data_criacao': _momento(rng, dia)
+            })
+        gravar_linhas(ContaMovimento, movimentos)
+        contagem['conta_movimento'] += len(movimentos)
+
+    crediarios = gravar_com_ids(Crediario, [{
+        'usuario_id': usuario_id, 'crediario': LOJAS[i % len(LOJAS)], 'tipo': rng.choice(tipo_crediario_enum.enums),
+        'final': f'{rng.randint(0, 9999):04d}', 'limite': _valor(rng, 500, 10000), 'descricao': None
+    } for i in range(min(volumes['crediarios'], len(LOJAS)))])
+    grupos = gravar_com_ids(CrediarioGrupo, [
+        {'usuario_id': usuario_id, 'grupo': grupo, 'tipo': 'Compra', 'descricao': None} for grupo in GRUPOS
+    ])
+    contagem['crediario'] += len(crediarios)
+    contagem['crediario_grupo'] += len(grupos)
+
+    if crediarios:
+        compras = []
+        for i in range(volumes['compras']):
+            data_compra = dia_aleatorio()
+            num_parcelas = rng.choice(PARCELAMENTOS)
+            valor_total = _valor(rng, 20, 4000)
+            primeira_parcela = (data_compra + relativedelta(months=1)).replace(day=10)
+            compras.append({
+                'usuario_id': usuario_id, 'crediario_id': rng.choice(crediarios), 'crediario_grupo_id': rng.choice(grupos),
+                'data_compra': data_compra, 'descricao': f'Compra {i + 1}', 'valor_total': valor_total,
+                'num_parcelas': num_parcelas, 'primeira_parcela': primeira_parcela,
+                'ultima_parcela': primeira_parcela + relativedelta(months=num_parcelas - 1),
+                'valor_parcela_mensal': round(valor_total / num_parcelas, 2), 'data_criacao': _momento(rng, data_compra)
+            })
+        ids_compras = gravar_com_ids(CrediarioMovimento, compras)
+        parcelas = [
+            {'crediario_movimento_id': compra_id, 'numero_parcela': numero + 1,
+             'vencimento': compra['primeira_parcela'] + relativedelta(months=numero),
+             'valor_parcela': compra['valor_parcela_mensal'], 'data_criacao': compra['data_criacao']}
+            for compra_id, compra in zip(ids_compras, compras) for numero in range(compra['num_parcelas'])
+        ]
+        gravar_linhas(CrediarioParcela, parcelas)
+        contagem['crediario_movimento'] += len(compras)
+        contagem['crediario_parcela'] += len(parcelas)
+
+    if contas:
+        financiamentos = []
+        for i in range(volumes['financiamentos']):
+            data_inicio = dia_aleatorio().replace(day=1)
+            financiamentos.append({
+                'usuario_id': usuario_id, 'conta_id': rng.choice(contas), 'nome_financiamento': f'FINANCIAMENTO {i + 1}',
+                'valor_total_financiado': _valor(rng, 10000, 400000),
+                'taxa_juros_anual': Decimal(rng.randint(60000, 99999)) / 10000,
+                'data_inicio': data_inicio, 'prazo_meses': rng.choice([48, 60, 120, 240, 360]),
+                'tipo_amortizacao': rng.choice(['SAC', 'PRICE']), 'data_criacao': _momento(rng, data_inicio),
+                'descricao': None
+            })
+        ids_financiamentos = gravar_com_ids(Financiamento, financiamentos)
+        parcelas = []
+        for financiamento_id, financiamento in zip(ids_financiamentos, financiamentos):
+            for parcela in calcular_tabela(financiamento['valor_total_financiado'], financiamento['taxa_juros_anual'],
+                                           financiamento['prazo_meses'], financiamento['tipo_amortizacao'],
+                                           financiamento['data_inicio']):
+                paga = parcela['data_vencimento'] <= ultimo_dia
+                parcela.update(
+                    financiamento_id=financiamento_id, status='Paga' if paga else 'A Pagar',
+                    data_pagamento=parcela['data_vencimento'] if paga else None,
+                    valor_pago=parcela['valor_total_previsto'] if paga else None,
+                    observacoes=None, data_criacao=financiamento['data_criacao']
+                )
+                parcelas.append(parcela)
+        gravar_linhas(FinanciamentoParcela, parcelas)
+        contagem['financiamento'] += len(financiamentos)
+        contagem['financiamento_parcela'] += len(parcelas)
+
+    rendas = RENDAS[:volumes['rendas']]
+    ids_rendas = gravar_com_ids(Renda, [
+        {'usuario_id': usuario_id, 'descricao': descricao, 'tipo': tipo} for descricao, tipo in rendas
+    ])
+    valores_renda = {renda_id: _valor(rng, 300, 12000) for renda_id in ids_rendas}
+    renda_movimentos = [
+        {'usuario_id': usuario_id, 'renda_id': renda_id, 'mes_ref': mes,
+         'mes_pagto': mes + relativedelta(months=1) if rng.random() < 0.5 else mes,
+         'valor': valores_renda[renda_id], 'data_criacao': _momento(rng, mes), 'descricao': None}
+        for mes in meses for renda_id in ids_rendas
+    ]
+    gravar_linhas(RendaMovimento, renda_movimentos)
+    contagem['renda'] += len(ids_rendas)
+    contagem['renda_movimento'] += len(renda_movimentos)
+
+    ids_despesas = gravar_com_ids(DespesaReceita, [
+        {'usuario_id': usuario_id, 'despesa_receita': despesa, 'tipo': 'Despesa', 'descricao': None}
+        for despesa in DESPESAS[:volumes['despesas']]
+    ])
+    valores_despesa = {despesa_id: _valor(rng, 40, 3000) for despesa_id in ids_despesas}
+    despesas_fixas = [
+        {'usuario_id': usuario_id, 'despesa_receita_id': despesa_id, 'mes_ano': mes,
+         'valor': valores_despesa[despesa_id], 'descricao': None}
+        for mes in meses for despesa_id in ids_despesas
+    ]
+    gravar_linhas(DespesaFixa, despesas_fixas)
+    contagem['despesa_receita'] += len(ids_despesas)
+    contagem['despesa_fixa'] += len(despesas_fixas)
+
+    # Tabelas derivadas, como se os lançamentos tivessem sido feitos pelas telas
+    contagem['conta_saldo_mensal'] += reconstruir_saldos_mensais(contas) if contas else 0
+    contagem['fato_mensal'] += reconstruir_fatos_mensais([usuario_id])
+    return contagem
+
+@click.command('seed')
+@click.option('--usuarios', default=10, show_default=True, help='Usuários a criar.')
+@click.option('--contas', default=3, show_default=True, help='Contas por usuário.')
+@click.option('--transacoes', default=len(TRANSACOES), show_default=True, help=f'Tipos de transação por usuário (máx. {len(TRANSACOES)}).')
+@click.option('--movimentos', default=2000, show_default=True, help='Movimentos bancários por usuário.')
+@click.option('--crediarios', default=3, show_default=True, help=f'Crediários por usuário (máx. {len(LOJAS)}).')
+@click.option('--compras', default=300, show_default=True, help='Compras no crediário por usuário (com parcelas).')
+@click.option('--financiamentos', default=1, show_default=True, help='Financiamentos por usuário (com tabela de parcelas).')
+@click.option('--rendas', default=3, show_default=True, help=f'Itens de renda por usuário (máx. {len(RENDAS)}); um movimento por mês.')
+@click.option('--despesas', default=6, show_default=True, help=f'Itens de despesa fixa por usuário (máx. {len(DESPESAS)}); um lançamento por mês.')
+@click.option('--meses', default=36, show_default=True, help='Meses de histórico.')
+@click.option('--ate', default=None, help='Último mês do histórico (AAAA-MM; padrão: mês atual).')
+@click.option('--semente', default=42, show_default=True, help='Semente do gerador.')
+@click.option('--prefixo', default='seed', show_default=True, help='Prefixo dos logins/e-mails gerados.')
+@click.option('--senha', default='senha123', show_default=True, help='Senha de todos os usuários gerados.')
+@with_appcontext
+def seed_command(usuarios, contas, transacoes, movimentos, crediarios, compras, financiamentos, rendas, despesas,
+                 meses, ate, semente, prefixo, senha):
+    """Cria usuários sintéticos com volume configurável de dados, de forma determinística."""
+    fim = datetime.strptime(ate, '%Y-%m').date() if ate else date.today().replace(day=1)
+    inicio = fim - relativedelta(months=meses - 1)
+    volumes = {'contas': contas, 'transacoes': transacoes, 'movimentos': movimentos, 'crediarios': crediarios,
+               'compras': compras, 'financiamentos': financiamentos, 'rendas': rendas, 'despesas': despesas}
+
+    existente = db.session.scalar(select(Usuario.login).where(Usuario.login.like(f'{prefixo}%')).limit(1))
+    if existente:
+        click.echo(f"Já existem usuários com o prefixo '{prefixo}' (ex.: {existente}); use --prefixo.", err=True)
+        raise SystemExit(1)
+
+    senha_hash = gerar_hash(senha)
+    total = Counter()
+    comeco = time.perf_counter()
+    for n in range(1, usuarios + 1):
+        total += gerar_usuario(n, semente, volumes, inicio, fim, senha_hash, prefixo)
+        db.session.commit()
+        if n % 10 == 0 or n == usuarios:
+            click.echo(f"{n}/{usuarios} usuários ({sum(total.values())} linhas, {time.perf_counter() - comeco:.1f}s)")
+
+    decorrido = time.perf_counter() - comeco
+    for tabela, quantidade in total.items():
+        click.echo(f"  {tabela:<24} {quantidade:>12}")
+    click.echo(f"{sum(total.values())} linhas em {decorrido:.1f}s ({sum(total.values()) / decorrido:.0f} linhas/s). "
+               f"Logins {prefixo}1..{prefixo}{usuarios}, senha '{senha}'.")
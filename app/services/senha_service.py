@@ -0,0 +1,61 @@
+# app/services/senha_service.py
+import statistics
+import time
+import click
+from functools import lru_cache
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Política de hash de senhas: o método e o custo vêm de SENHA_HASH_METODO (formato do Werkzeug,
+# ex.: "scrypt:32768:8:1" ou "pbkdf2:sha256:600000"). Hashes gravados com outros parâmetros
+# são refeitos no próximo login bem-sucedido, sem exigir troca de senha.
+
+def metodo_configurado():
+    return current_app.config['SENHA_HASH_METODO']
+
+@lru_cache(maxsize=8)
+def _prefixo_do_metodo(metodo):
+    # O Werkzeug completa parâmetros omitidos ("scrypt" -> "scrypt:32768:8:1"); o prefixo de um hash real é a forma canônica
+    return generate_password_hash('', method=metodo).split('$', 1)[0]
+
+def gerar_hash(senha):
+    return generate_password_hash(senha, method=metodo_configurado())
+
+def verificar(senha_hash, senha):
+    return check_password_hash(senha_hash, senha)
+
+def precisa_rehash(senha_hash):
+    return senha_hash.split('$', 1)[0] != _prefixo_do_metodo(metodo_configurado())
+
+CANDIDATOS = {
+    'scrypt': [f'scrypt:{2 ** expoente}:8:1' for expoente in range(14, 19)],
+    'pbkdf2': [f'pbkdf2:sha256:{iteracoes}' for iteracoes in (300000, 600000, 1000000, 1500000, 2000000)]
+}
+
+def medir_metodo(metodo, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        generate_password_hash('calibracao-de-senha', method=metodo)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+@click.command('calibrar-hash-senha')
+@click.option('--alvo-ms', default=250, show_default=True, help='Tempo máximo desejado por hash, em milissegundos.')
+@click.option('--algoritmo', type=click.Choice(sorted(CANDIDATOS)), default='scrypt', show_default=True)
+@click.option('--repeticoes', default=3, show_default=True, help='Medições por candidato (usa a mediana).')
+def calibrar_hash_senha_command(alvo_ms, algoritmo, repeticoes):
+    """Mede o custo dos parâmetros de hash neste servidor e sugere SENHA_HASH_METODO."""
+    escolhido = None
+    for metodo in CANDIDATOS[algoritmo]:
+        tempo_ms = medir_metodo(metodo, repeticoes)
+        click.echo(f"{metodo:<28} {tempo_ms:8.1f} ms")
+        if tempo_ms > alvo_ms:
+            break
+        escolhido = metodo
+
+    click.echo(f"Atual: SENHA_HASH_METODO={metodo_configurado()}")
+    if escolhido is None:
+        click.echo(f"Nenhum candidato ficou abaixo de {alvo_ms} ms; use {CANDIDATOS[algoritmo][0]} ou aumente o alvo.")
+    else:
+        click.echo(f"Sugerido para {alvo_ms} ms: SENHA_HASH_METODO={escolhido}")
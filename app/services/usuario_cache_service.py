@@ -0,0 +1,76 @@
+# app/services/usuario_cache_service.py
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from app import db
+from app.models.usuario_model import Usuario
+from app.services.barramento_invalidacao import barramento
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+# Cache local do processo para o user_loader: evita o SELECT em usuario a cada requisição.
+# A chave inclui uma versão por usuário, incrementada pelas rotas que alteram o registro;
+# entradas de versões antigas deixam de ser encontradas. Alterações em usuario também seguem
+# pelo barramento de invalidação para os outros workers; sem ele (ou se uma mensagem se perder),
+# o TTL limita por quanto tempo outro processo pode enxergar dados antigos, como is_active.
+
+_lock = threading.Lock()
+_entradas = OrderedDict() # (user_id, versao) -> (expira_em, valores das colunas)
+_versoes = {}
+
+COLUNAS = [atributo.key for atributo in inspect(Usuario).column_attrs]
+
+def invalidar_usuario(user_id):
+    with _lock:
+        _versoes[user_id] = _versoes.get(user_id, 0) + 1
+        for chave in [chave for chave in _entradas if chave[0] == user_id]:
+            del _entradas[chave]
+
+def limpar_cache_usuarios():
+    with _lock:
+        _entradas.clear()
+
+barramento.registrar('usuario', invalidar_usuario, limpar_cache_usuarios)
+
+@event.listens_for(Session, 'before_flush')
+def _publicar_alteracoes(session, flush_context, instances):
+    # A invalidação local continua nas rotas, depois do commit; aqui só se avisa os outros processos
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, Usuario) and (obj in session.deleted or session.is_modified(obj)):
+            barramento.publicar(session, 'usuario', obj.id)
+
+def carregar_usuario(user_id):
+    ttl = current_app.config['USER_CACHE_TTL']
+    if ttl <= 0:
+        return Usuario.query.get(user_id)
+
+    agora = time.monotonic()
+    with _lock:
+        chave = (user_id, _versoes.get(user_id, 0))
+        entrada = _entradas.get(chave)
+        if entrada is not None and entrada[0] <= agora:
+            del _entradas[chave]
+            entrada = None
+        if entrada is not None:
+            _entradas.move_to_end(chave)
+
+    if entrada is not None:
+        # Reconstrói a instância como "detached" e a anexa à sessão sem consultar o banco,
+        # para que alterações em current_user e relacionamentos continuem funcionando
+        usuario = Usuario(**entrada[1])
+        make_transient_to_detached(usuario)
+        return db.session.merge(usuario, load=False)
+
+    usuario = Usuario.query.get(user_id)
+    if usuario is None:
+        return None
+
+    # Gravado com a versão lida antes da consulta: se o usuário mudou nesse meio tempo, a entrada já nasce obsoleta
+    valores = {coluna: getattr(usuario, coluna) for coluna in COLUNAS}
+    with _lock:
+        _entradas[chave] = (agora + ttl, valores)
+        _entradas.move_to_end(chave)
+        while len(_entradas) > current_app.config['USER_CACHE_MAX']:
+            _entradas.popitem(last=False)
+    return usuario
@@ -0,0 +1,90 @@
+# app/utils/etag.py
+import hashlib
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, make_response, request, session
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from app import db
+from app.models.usuario_model import Usuario
+
+# Geração dos dados de cada usuário: um contador em usuario.geracao_dados, incrementado uma vez
+# por transação que grava algo em nome do usuário logado. As listas marcadas com @etag_por_geracao
+# usam esse número num ETag forte e respondem 304 a If-None-Match sem consultar as tabelas nem renderizar.
+
+# Gravações que não alteram o conteúdo das listas do usuário
+TABELAS_IGNORADAS = {'audit_log'}
+
+def _usuario_logado_id():
+    # Só considera o usuário já carregado pelo flask-login: não dispara o user_loader dentro de um flush
+    if not has_request_context():
+        return None
+    usuario = g.get('_login_user')
+    if usuario is None or not usuario.is_authenticated:
+        return None
+    return usuario.id
+
+def _registrar_escrita(session):
+    if session.info.get('geracao_incrementada'):
+        return
+    usuario_id = _usuario_logado_id()
+    if usuario_id is None:
+        return
+    session.info['geracao_incrementada'] = True
+    tabela = Usuario.__table__
+    session.connection().execute(
+        update(tabela).where(tabela.c.id == usuario_id).values(geracao_dados=tabela.c.geracao_dados + 1)
+    )
+
+@event.listens_for(Session, 'after_flush')
+def _escrita_via_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if obj.__table__.name not in TABELAS_IGNORADAS:
+            _registrar_escrita(session)
+            return
+
+@event.listens_for(Session, 'do_orm_execute')
+def _escrita_via_execute(orm_execute_state):
+    # INSERT/UPDATE/DELETE em lote (Core) enviados pela sessão
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if orm_execute_state.statement.table.name not in TABELAS_IGNORADAS:
+            _registrar_escrita(orm_execute_state.session)
+
+@event.listens_for(Session, 'after_transaction_end')
+def _fim_da_transacao(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('geracao_incrementada', None)
+
+def geracao_atual(usuario_id):
+    # Leitura direta da coluna (não passa pelo cache do user_loader nem pelo identity map)
+    return db.session.execute(select(Usuario.geracao_dados).where(Usuario.id == usuario_id)).scalar()
+
+def init_etag(app):
+    # Muda a cada inicialização se não for configurado: um deploy com templates novos não reaproveita ETags antigos
+    app.config.setdefault('ETAG_VERSAO', None)
+    if not app.config['ETAG_VERSAO']:
+        app.config['ETAG_VERSAO'] = str(int(time.time()))
+
+def etag_por_geracao(view):
+    # Usar abaixo de @login_required
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Mensagens flash pendentes fazem parte da página: sem atalho por ETag
+        if request.method != 'GET' or session.get('_flashes'):
+            return view(*args, **kwargs)
+
+        usuario_id = _usuario_logado_id()
+        chave = f"{current_app.config['ETAG_VERSAO']}|{usuario_id}|{geracao_atual(usuario_id)}|{request.full_path}"
+        etag = hashlib.sha256(chave.encode()).hexdigest()[:32]
+
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        # O navegador guarda a página mas sempre revalida
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
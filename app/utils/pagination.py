@@ -0,0 +1,127 @@
+# app/utils/pagination.py
+import base64
+import json
+from datetime import date, datetime
+from flask import current_app, request, url_for
+from sqlalchemy import tuple_
+
+# Paginação por cursor (keyset): cada página busca a partir da chave da última linha exibida,
+# então o custo é o mesmo na primeira ou na milésima página.
+# As colunas de ordenação são sempre decrescentes (mais recentes primeiro) e devem terminar em uma chave única (id).
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+def _decode_value(value, column):
+    # O cursor vem do cliente: cada valor precisa ter o tipo da coluna de ordenação,
+    # senão a comparação com a coluna falha no banco
+    if value is None and column.nullable:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value['dt'])
+    if python_type is date:
+        return date.fromisoformat(value['d'])
+    if python_type is int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(value)
+        return value
+    if not isinstance(value, python_type):
+        raise ValueError(value)
+    return value
+
+def encode_cursor(values):
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, sort_columns):
+    # Cursor inválido é ignorado (None): a rota serve a primeira página
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        if not isinstance(values, list) or len(values) != len(sort_columns):
+            return None
+        return [_decode_value(v, column) for v, column in zip(values, sort_columns)]
+    except (ValueError, TypeError, KeyError, NotImplementedError):
+        return None
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, prev_cursor=None, per_page=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.per_page = per_page
+        self.next_url = None
+        self.prev_url = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+def paginate_keyset(query, sort_columns, cursor=None, direction='next', per_page=50):
+    def key_of(item):
+        return [getattr(item, column.key) for column in sort_columns]
+
+    keys = decode_cursor(cursor, sort_columns) if cursor else None
+    if keys is None:
+        direction = 'next'
+
+    if direction == 'prev':
+        # Página anterior: busca em ordem crescente a partir do cursor e inverte o resultado
+        rows = query.filter(tuple_(*sort_columns) > tuple_(*keys)).order_by(
+            *[column.asc() for column in sort_columns]
+        ).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        prev_cursor = encode_cursor(key_of(items[0])) if has_more and items else None
+        next_cursor = encode_cursor(key_of(items[-1])) if items else None
+        return KeysetPage(items, next_cursor, prev_cursor, per_page)
+
+    if keys is not None:
+        query = query.filter(tuple_(*sort_columns) < tuple_(*keys))
+    rows = query.order_by(*[column.desc() for column in sort_columns]).limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+    next_cursor = encode_cursor(key_of(items[-1])) if has_more and items else None
+    prev_cursor = encode_cursor(key_of(items[0])) if keys is not None and items else None
+    return KeysetPage(items, next_cursor, prev_cursor, per_page)
+
+def get_per_page():
+    default = current_app.config.get('ITENS_POR_PAGINA', 50)
+    maximum = current_app.config.get('ITENS_POR_PAGINA_MAX', 200)
+    try:
+        per_page = int(request.args.get('por_pagina', default))
+    except ValueError:
+        per_page = default
+    return max(1, min(per_page, maximum))
+
+def paginate_keyset_from_request(query, sort_columns):
+    # Lê cursor, direção e tamanho da página da query string e monta os links de navegação
+    page = paginate_keyset(
+        query,
+        sort_columns,
+        cursor=request.args.get('cursor'),
+        direction=request.args.get('direcao', 'next'),
+        per_page=get_per_page()
+    )
+
+    args = {k: v for k, v in request.args.items() if k not in ('cursor', 'direcao')}
+    args.update(request.view_args or {})
+    if page.has_next:
+        page.next_url = url_for(request.endpoint, cursor=page.next_cursor, direcao='next', **args)
+    if page.has_prev:
+        page.prev_url = url_for(request.endpoint, cursor=page.prev_cursor, direcao='prev', **args)
+    return page
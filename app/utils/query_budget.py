@@ -0,0 +1,94 @@
+# app/utils/query_budget.py
+import re
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Conta as consultas SQL de cada requisição e agrupa pelo "formato" do comando.
+# Formatos repetidos na mesma requisição são o sintoma típico de N+1.
+# Rotas declaram um orçamento com @query_budget(n); em desenvolvimento o excesso gera aviso e em teste, erro.
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.shapes = Counter()
+
+    def record(self, statement):
+        self.count += 1
+        self.shapes[statement_shape(statement)] += 1
+
+    def duplicated(self, threshold):
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*\)")
+_SPACES_RE = re.compile(r'\s+')
+
+def statement_shape(statement):
+    shape = _LITERAL_RE.sub('?', statement)
+    shape = _IN_LIST_RE.sub('(...)', shape)
+    return _SPACES_RE.sub(' ', shape).strip()
+
+def current_query_stats():
+    if has_request_context():
+        return g.get('_query_stats')
+    return None
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(statement)
+
+def query_budget(max_queries):
+    # Usar logo abaixo de @blueprint.route, para marcar a função registrada como view
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+def budget_mode(app):
+    mode = app.config.get('QUERY_BUDGET_MODE')
+    if mode:
+        return mode
+    if app.testing:
+        return 'raise'
+    if app.debug:
+        return 'warn'
+    return 'off'
+
+def init_query_budget(app):
+    @app.before_request
+    def start_query_stats():
+        if budget_mode(current_app) != 'off':
+            g._query_stats = QueryStats()
+
+    @app.after_request
+    def check_query_budget(response):
+        stats = g.pop('_query_stats', None)
+        if stats is None:
+            return response
+
+        mode = budget_mode(current_app)
+        threshold = current_app.config.get('QUERY_DUPLICATE_THRESHOLD', 3)
+        duplicated = stats.duplicated(threshold)
+        view = current_app.view_functions.get(request.endpoint)
+        budget = getattr(view, 'query_budget', None)
+
+        current_app.logger.info(
+            "%s %s (%s): %d consultas SQL, %d formatos repetidos",
+            request.method, request.path, request.endpoint, stats.count, len(duplicated)
+        )
+        for shape, n in duplicated.items():
+            current_app.logger.warning("Possível N+1 em %s: %dx %s", request.endpoint, n, shape[:300])
+
+        if budget is not None and stats.count > budget:
+            message = f"{request.endpoint} executou {stats.count} consultas SQL (orçamento: {budget})"
+            if mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            current_app.logger.warning(message)
+        return response
@@ -0,0 +1,100 @@
+# app/utils/request_timing.py
+import json
+import time
+from flask import current_app, g, has_request_context, request
+from flask.signals import before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Tempos de cada requisição: total, SQL (tempo e número de comandos) e renderização de templates.
+# Vão no cabeçalho Server-Timing (visível na aba de rede do navegador) e, acima de SLOW_REQUEST_MS,
+# num log estruturado com o endpoint, para investigar relatos de lentidão.
+
+class RequestTiming:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_ms = 0.0
+        self.sql_count = 0
+        self.template_ms = 0.0
+        self._templates = []
+
+    def total_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+def current_timing():
+    if has_request_context():
+        return g.get('_request_timing')
+    return None
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _sql_start(conn, cursor, statement, parameters, context, executemany):
+    if current_timing() is not None:
+        conn.info.setdefault('_request_timing_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _sql_end(conn, cursor, statement, parameters, context, executemany):
+    timing = current_timing()
+    starts = conn.info.get('_request_timing_start')
+    if timing is None or not starts:
+        return
+    timing.sql_ms += (time.perf_counter() - starts.pop()) * 1000
+    timing.sql_count += 1
+
+@event.listens_for(Engine, 'handle_error')
+def _sql_error(exception_context):
+    # Comando com erro não chega ao after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('_request_timing_start'):
+        conn.info['_request_timing_start'].pop()
+
+def _template_start(sender, template, context, **extra):
+    timing = current_timing()
+    if timing is not None:
+        timing._templates.append(time.perf_counter())
+
+def _template_end(sender, template, context, **extra):
+    timing = current_timing()
+    if timing is not None and timing._templates:
+        inicio = timing._templates.pop()
+        # Só o template mais externo conta, para não somar duas vezes um render_template aninhado
+        if not timing._templates:
+            timing.template_ms += (time.perf_counter() - inicio) * 1000
+
+before_render_template.connect(_template_start)
+template_rendered.connect(_template_end)
+
+def server_timing_header(timing, total_ms):
+    return (f'total;dur={total_ms:.1f}, '
+            f'db;dur={timing.sql_ms:.1f};desc="{timing.sql_count} SQL", '
+            f'tpl;dur={timing.template_ms:.1f}')
+
+def init_request_timing(app):
+    @app.before_request
+    def start_request_timing():
+        g._request_timing = RequestTiming()
+
+    @app.after_request
+    def report_request_timing(response):
+        timing = g.pop('_request_timing', None)
+        if timing is None:
+            return response
+
+        total_ms = timing.total_ms()
+        if current_app.config.get('SERVER_TIMING'):
+            response.headers['Server-Timing'] = server_timing_header(timing, total_ms)
+
+        limite = current_app.config.get('SLOW_REQUEST_MS')
+        if limite and total_ms >= limite:
+            usuario = g.get('_login_user')
+            current_app.logger.warning("Requisição lenta: %s", json.dumps({
+                'endpoint': request.endpoint,
+                'metodo': request.method,
+                'caminho': request.path,
+                'status': response.status_code,
+                'total_ms': round(total_ms, 1),
+                'sql_ms': round(timing.sql_ms, 1),
+                'sql_comandos': timing.sql_count,
+                'template_ms': round(timing.template_ms, 1),
+                'usuario_id': usuario.id if usuario is not None and usuario.is_authenticated else None,
+            }, ensure_ascii=False))
+        return response
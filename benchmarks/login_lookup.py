@@ -0,0 +1,71 @@
+# benchmarks/login_lookup.py
+# Mede o tempo da busca de usuário no login conforme a tabela usuario cresce.
+# Os usuários sintéticos são inseridos numa transação desfeita ao final: o banco não é alterado.
+#
+# Uso: python benchmarks/login_lookup.py [--tamanhos 1000,10000,100000] [--repeticoes 500]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.usuario_model import Usuario
+from app.services.autenticacao_service import buscar_usuario_para_login
+from sqlalchemy import insert, or_, text
+
+LOTE = 5000
+
+def inserir_usuarios(inicio, fim):
+    for lote_inicio in range(inicio, fim, LOTE):
+        db.session.execute(insert(Usuario).values([
+            {
+                'nome': 'Usuario Benchmark',
+                'email': f'bench{n}@exemplo.com',
+                'login': f'bench{n}',
+                'senha_hash': 'x',
+                'is_active': True,
+                'is_admin': False
+            }
+            for n in range(lote_inicio, min(lote_inicio + LOTE, fim))
+        ]))
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text('ANALYZE usuario'))
+
+def medir(funcao, identificadores):
+    inicio = time.perf_counter()
+    for identificador in identificadores:
+        funcao(identificador)
+    return (time.perf_counter() - inicio) / len(identificadores) * 1e6
+
+def busca_com_or(identificador):
+    # Consulta anterior da rota de login, para comparação
+    return Usuario.query.filter(or_(Usuario.login == identificador, Usuario.email == identificador)).first()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tamanhos', default='1000,10000,100000')
+    parser.add_argument('--repeticoes', type=int, default=500)
+    args = parser.parse_args()
+    tamanhos = sorted(int(t) for t in args.tamanhos.split(','))
+
+    app = create_app()
+    with app.app_context():
+        print(f"{'usuarios':>10} {'login (us)':>12} {'email (us)':>12} {'OR antigo (us)':>15}")
+        inseridos = 0
+        try:
+            for tamanho in tamanhos:
+                inserir_usuarios(inseridos, tamanho)
+                inseridos = tamanho
+                passo = max(1, tamanho // args.repeticoes)
+                numeros = list(range(0, tamanho, passo))[:args.repeticoes]
+                logins = [f'bench{n}' for n in numeros]
+                emails = [f'BENCH{n}@exemplo.com' for n in numeros]
+                print(f"{tamanho:>10} {medir(buscar_usuario_para_login, logins):>12.1f} "
+                      f"{medir(buscar_usuario_para_login, emails):>12.1f} {medir(busca_com_or, logins):>15.1f}")
+        finally:
+            db.session.rollback()
+
+if __name__ == '__main__':
+    main()
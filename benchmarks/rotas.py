@@ -0,0 +1,247 @@
+# benchmarks/rotas.py
+# Mede as rotas mais usadas pelo cliente de teste do Flask: latência (percentis) e consultas SQL por requisição,
+# em vários tamanhos de dados. Para cada tamanho, um usuário "bench_rotas<tamanho>" é gerado pelo mesmo gerador
+# do "flask seed" (na primeira execução; depois é reaproveitado, pois os dados são determinísticos).
+# Os resultados vão para um arquivo JSON; --comparar mostra a variação em relação a uma execução anterior.
+#
+# Uso: python benchmarks/rotas.py [--tamanhos 500,5000,50000] [--repeticoes 30] [--saida resultado.json]
+#                                 [--comparar anterior.json] [--com-cache]
+import argparse
+import csv
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.usuario_model import Usuario
+from app.models.conta_model import Conta
+from app.models.conta_movimento_model import ContaMovimento
+from app.models.crediario_movimento_model import CrediarioMovimento
+from app.models.crediario_parcela_model import CrediarioParcela
+from app.models.financiamento_model import Financiamento
+from app.models.financiamento_parcela_model import FinanciamentoParcela
+from app.services.amortizacao_service import calcular_tabela
+from app.services.audit_sink import audit_sink
+from app.services.cache_resultados import cache_resultados
+from app.services.fato_mensal_service import recalcular_fatos
+from app.services.importacao_parcelas_service import CABECALHO_OBRIGATORIO
+from app.services.limitador_login import limitador_login
+from app.services.seed_service import gerar_usuario
+from app.services.senha_service import gerar_hash
+from sqlalchemy import delete, event, func, insert, select
+from dateutil.relativedelta import relativedelta
+
+PREFIXO = 'bench_rotas'
+SENHA = 'senha123'
+# Fim fixo do histórico: os usuários gerados são os mesmos em qualquer data
+ATE = date(2024, 12, 1)
+MESES = 36
+PARCELAS_CSV = 360
+
+def volumes(tamanho):
+    return {'contas': 3, 'transacoes': 8, 'movimentos': tamanho, 'crediarios': 3, 'compras': max(1, tamanho // 10),
+            'financiamentos': 1, 'rendas': 3, 'despesas': 6}
+
+class ContadorConsultas:
+    # Conta só as consultas da thread do benchmark (a auditoria grava em outra thread)
+    def __init__(self, engine):
+        self.total = 0
+        self._thread = threading.get_ident()
+        event.listen(engine, 'before_cursor_execute', self._contar)
+
+    def _contar(self, *args):
+        if threading.get_ident() == self._thread:
+            self.total += 1
+
+def garantir_usuario(tamanho):
+    login = f'{PREFIXO}{tamanho}'
+    usuario_id = db.session.scalar(select(Usuario.id).where(Usuario.login == login))
+    if usuario_id is None:
+        inicio = ATE - relativedelta(months=MESES - 1)
+        print(f"Gerando usuário {login}...", flush=True)
+        gerar_usuario(tamanho, 0, volumes(tamanho), inicio, ATE, gerar_hash(SENHA), PREFIXO)
+        db.session.commit()
+        usuario_id = db.session.scalar(select(Usuario.id).where(Usuario.login == login))
+    return login, usuario_id
+
+def linhas_do_usuario(usuario_id):
+    return {
+        'conta_movimento': db.session.scalar(select(func.count()).where(ContaMovimento.usuario_id == usuario_id)),
+        'crediario_movimento': db.session.scalar(select(func.count()).where(CrediarioMovimento.usuario_id == usuario_id)),
+        'crediario_parcela': db.session.scalar(select(func.count()).select_from(CrediarioParcela).join(
+            CrediarioMovimento, CrediarioParcela.crediario_movimento_id == CrediarioMovimento.id
+        ).where(CrediarioMovimento.usuario_id == usuario_id)),
+        'financiamento_parcela': db.session.scalar(select(func.count()).select_from(FinanciamentoParcela).join(
+            Financiamento, FinanciamentoParcela.financiamento_id == Financiamento.id
+        ).where(Financiamento.usuario_id == usuario_id)),
+    }
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = (len(ordenados) - 1) * p / 100
+    inferior = int(indice)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (indice - inferior)
+
+def resumo(tempos, consultas, status):
+    return {
+        'repeticoes': len(tempos),
+        'latencia_ms': {
+            'p50': round(percentil(tempos, 50), 3), 'p90': round(percentil(tempos, 90), 3),
+            'p95': round(percentil(tempos, 95), 3), 'p99': round(percentil(tempos, 99), 3),
+            'media': round(statistics.mean(tempos), 3), 'min': round(min(tempos), 3), 'max': round(max(tempos), 3),
+        },
+        'consultas': {'media': round(statistics.mean(consultas), 2), 'max': max(consultas)},
+        'status': {str(codigo): quantidade for codigo, quantidade in sorted(status.items())},
+    }
+
+def medir(contador, repeticoes, requisicao, preparar=None, limpar=None):
+    tempos, consultas, status = [], [], Counter()
+    for i in range(repeticoes):
+        if preparar:
+            preparar(i)
+        contador.total = 0
+        inicio = time.perf_counter()
+        resposta = requisicao(i)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(contador.total)
+        status[resposta.status_code] += 1
+        if limpar:
+            limpar(i)
+    return resumo(tempos, consultas, status)
+
+def csv_de_parcelas():
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CABECALHO_OBRIGATORIO)
+    for parcela in calcular_tabela(200000, 9.5, PARCELAS_CSV, 'PRICE', ATE):
+        writer.writerow([parcela[coluna] for coluna in CABECALHO_OBRIGATORIO])
+    return buffer.getvalue().encode()
+
+def medir_tamanho(app, contador, tamanho, repeticoes):
+    # As requisições rodam sem contexto de aplicação ativo: cada uma abre o seu, como no servidor
+    with app.app_context():
+        login, usuario_id = garantir_usuario(tamanho)
+        conta_id = db.session.scalar(select(Conta.id).where(Conta.usuario_id == usuario_id).order_by(Conta.id).limit(1))
+        financiamento_id = db.session.scalar(
+            select(Financiamento.id).where(Financiamento.usuario_id == usuario_id).order_by(Financiamento.id).limit(1))
+        linhas = linhas_do_usuario(usuario_id)
+    meses = [(ATE - relativedelta(months=i)).strftime('%Y-%m') for i in range(MESES)]
+
+    cliente = app.test_client()
+    cliente.post('/usuarios/login', data={'login_id': login, 'senha': SENHA})
+
+    rotas = {
+        'exibir_extrato': lambda i: cliente.post('/extratos_bancarios/exibir', data={'conta_id': conta_id, 'mes_ano': meses[i % MESES]}),
+        'exibir_extrato_crediario': lambda i: cliente.post('/extratos_crediarios/exibir', data={'crediario_id': 'all', 'mes_ano': meses[i % MESES]}),
+        'list_movimentos': lambda i: cliente.get('/conta_movimentos/'),
+        'list_parcelas_financiamento': lambda i: cliente.get(f'/financiamentos/{financiamento_id}/parcelas'),
+        # Cliente novo a cada vez: um cliente já autenticado seria só redirecionado
+        'login': lambda i: app.test_client().post('/usuarios/login', data={'login_id': login, 'senha': SENHA}),
+    }
+    resultados = {nome: medir(contador, repeticoes, requisicao) for nome, requisicao in rotas.items()}
+
+    # Importação: cada repetição usa um financiamento novo, removido em seguida
+    arquivo = csv_de_parcelas()
+    importacao = {}
+
+    def preparar(i):
+        with app.app_context():
+            importacao['id'] = db.session.execute(insert(Financiamento).values(
+                usuario_id=usuario_id, conta_id=conta_id, nome_financiamento=f'BENCH IMPORTACAO {i}',
+                valor_total_financiado=200000, taxa_juros_anual=9.5, data_inicio=ATE, prazo_meses=PARCELAS_CSV,
+                tipo_amortizacao='PRICE', data_criacao=datetime.utcnow()
+            ).returning(Financiamento.id)).scalar()
+            db.session.commit()
+
+    def limpar(i):
+        with app.app_context():
+            db.session.execute(delete(FinanciamentoParcela).where(FinanciamentoParcela.financiamento_id == importacao['id']))
+            db.session.execute(delete(Financiamento).where(Financiamento.id == importacao['id']))
+            recalcular_fatos('financiamento_parcela', usuario_id, importacao['id'])
+            db.session.commit()
+
+    resultados['importar_parcelas_financiamento_csv'] = medir(
+        contador, repeticoes,
+        lambda i: cliente.post(f"/financiamentos/importar_parcelas_csv/{importacao['id']}",
+                               data={'file': (io.BytesIO(arquivo), 'parcelas.csv')}, content_type='multipart/form-data'),
+        preparar, limpar
+    )
+    return linhas, resultados
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def imprimir(resultados, anterior=None):
+    referencia = {(r['rota'], r['tamanho']): r for r in (anterior or {}).get('resultados', [])}
+    print(f"{'rota':<38} {'tamanho':>8} {'p50 ms':>9} {'p95 ms':>9} {'consultas':>10}" + (f" {'Δp50':>8}" if anterior else ''))
+    for r in resultados:
+        linha = (f"{r['rota']:<38} {r['tamanho']:>8} {r['latencia_ms']['p50']:>9.2f} {r['latencia_ms']['p95']:>9.2f} "
+                 f"{r['consultas']['media']:>10.1f}")
+        antes = referencia.get((r['rota'], r['tamanho']))
+        if antes:
+            linha += f" {(r['latencia_ms']['p50'] / antes['latencia_ms']['p50'] - 1) * 100:>+7.1f}%"
+        print(linha)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark das rotas mais usadas.')
+    parser.add_argument('--tamanhos', default='500,5000,50000', help='Movimentos bancários por usuário (compras = 1/10).')
+    parser.add_argument('--repeticoes', type=int, default=30)
+    parser.add_argument('--saida', default=None, help='Arquivo JSON de resultado (padrão: benchmark_rotas_<data>.json).')
+    parser.add_argument('--comparar', default=None, help='JSON de uma execução anterior para comparação.')
+    parser.add_argument('--com-cache', action='store_true', help='Mantém os caches de resultados, usuários e listas ligados.')
+    args = parser.parse_args()
+    tamanhos = sorted(int(t) for t in args.tamanhos.split(','))
+
+    app = create_app()
+    app.config.update(QUERY_BUDGET_MODE='off', LOGIN_LIMITE_IP=None, LOGIN_LIMITE_LOGIN=None)
+    if not args.com_cache:
+        app.config.update(RESULT_CACHE_BACKEND='off', USER_CACHE_TTL=0, REFERENCIA_CACHE_TTL=0)
+    cache_resultados.init_app(app)
+    limitador_login.init_app(app)
+
+    with app.app_context():
+        contador = ContadorConsultas(db.engine)
+        banco = db.engine.dialect.name
+
+    resultados = []
+    for tamanho in tamanhos:
+        linhas, medidas_por_rota = medir_tamanho(app, contador, tamanho, args.repeticoes)
+        for rota, medidas in medidas_por_rota.items():
+            resultados.append({'rota': rota, 'tamanho': tamanho, 'linhas': linhas, **medidas})
+    audit_sink.flush(timeout=10)
+
+    saida = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_atual(),
+        'banco': banco,
+        'caches': args.com_cache,
+        'repeticoes': args.repeticoes,
+        'resultados': resultados,
+    }
+    arquivo = args.saida or f"benchmark_rotas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        json.dump(saida, f, indent=2, ensure_ascii=False)
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anterior = json.load(f)
+    imprimir(resultados, anterior)
+    print(f"Resultado gravado em {arquivo}")
+
+if __name__ == '__main__':
+    main()
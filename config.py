@@ -10,4 +10,69 @@ class Config:
     REMEMBER_COOKIE_DURATION = 3600 
     REMEMBER_COOKIE_SECURE = True 
     REMEMBER_COOKIE_HTTPONLY = True 
-    REMEMBER_COOKIE_SAMESITE = 'Lax' 
\ No newline at end of file
+    REMEMBER_COOKIE_SAMESITE = 'Lax'
+
+    # Paginação das listas de movimentos (cursor/keyset)
+    ITENS_POR_PAGINA = int(os.environ.get('ITENS_POR_PAGINA', 50))
+    ITENS_POR_PAGINA_MAX = int(os.environ.get('ITENS_POR_PAGINA_MAX', 200))
+
+    # Orçamento de consultas SQL por rota: 'off', 'warn' ou 'raise' (padrão: raise em teste, warn em debug)
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE')
+    QUERY_DUPLICATE_THRESHOLD = int(os.environ.get('QUERY_DUPLICATE_THRESHOLD', 3))
+
+    # Tempos da requisição (total, SQL e templates) no cabeçalho Server-Timing ('0' desativa)
+    # e log das requisições acima de SLOW_REQUEST_MS milissegundos (0 desativa)
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', '1') != '0'
+    SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 1000))
+
+    # Métricas em /metrics: com METRICAS_DIR (diretório compartilhado pelos workers, limpo a cada implantação)
+    # os valores de todos os processos são somados; cada um grava o seu a cada METRICAS_INTERVALO segundos.
+    # A coleta exige "Authorization: Bearer <METRICAS_TOKEN>"; sem token configurado, /metrics responde 403
+    METRICAS_DIR = os.environ.get('METRICAS_DIR')
+    METRICAS_INTERVALO = int(os.environ.get('METRICAS_INTERVALO', 10))
+    METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')
+
+    # Auditoria: 'async' (fila + thread, padrão) ou 'sync' (padrão em teste)
+    AUDIT_SINK_MODE = os.environ.get('AUDIT_SINK_MODE')
+    AUDIT_SINK_BATCH_SIZE = int(os.environ.get('AUDIT_SINK_BATCH_SIZE', 100))
+    AUDIT_SINK_FLUSH_INTERVAL = float(os.environ.get('AUDIT_SINK_FLUSH_INTERVAL', 2.0))
+    # Meses de log de auditoria mantidos pelo comando "flask audit-log retencao"
+    AUDIT_LOG_RETENCAO_MESES = int(os.environ.get('AUDIT_LOG_RETENCAO_MESES', 12))
+
+    # Cache do usuário logado (user_loader): segundos de validade (0 desativa) e número máximo de entradas
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    USER_CACHE_MAX = int(os.environ.get('USER_CACHE_MAX', 1024))
+
+    # Limite de tentativas de login ("tentativas/segundos"; vazio desativa): LOGIN_LIMITE_IP conta todas as
+    # tentativas do IP; LOGIN_LIMITE_LOGIN, só as senhas erradas de cada login a partir do mesmo IP.
+    # Sem LOGIN_LIMITE_REDIS_URL os baldes ficam na memória de cada processo
+    LOGIN_LIMITE_IP = os.environ.get('LOGIN_LIMITE_IP', '20/60')
+    LOGIN_LIMITE_LOGIN = os.environ.get('LOGIN_LIMITE_LOGIN', '5/60')
+    LOGIN_LIMITE_REDIS_URL = os.environ.get('LOGIN_LIMITE_REDIS_URL')
+    # Proxies reversos confiáveis à frente da aplicação (nginx, balanceador). Com 1 ou mais, o IP do cliente
+    # vem do X-Forwarded-For (ProxyFix); sem isso todos os acessos parecem vir do proxy e dividem o mesmo
+    # balde de LOGIN_LIMITE_IP. Não configure acima do número real de proxies: o cabeçalho seria forjável
+    PROXIES_CONFIAVEIS = int(os.environ.get('PROXIES_CONFIAVEIS', 0))
+
+    # Método e custo do hash de senhas no formato do Werkzeug; calibre com "flask calibrar-hash-senha".
+    # Hashes antigos são refeitos no próximo login bem-sucedido
+    SENHA_HASH_METODO = os.environ.get('SENHA_HASH_METODO', 'scrypt:32768:8:1')
+
+    # Compõe o ETag das listas; se vazio, muda a cada inicialização. Defina o mesmo valor em todos os workers
+    # (ex.: o hash do commit implantado) para que compartilhem os ETags
+    ETAG_VERSAO = os.environ.get('ETAG_VERSAO')
+
+    # Cache de resultados dos extratos: 'memoria' (LRU por processo), 'redis' (compartilhado),
+    # 'local' (backend compartilhado sobre um cliente em memória, para desenvolvimento) ou 'off'
+    RESULT_CACHE_BACKEND = os.environ.get('RESULT_CACHE_BACKEND', 'memoria')
+    RESULT_CACHE_MAX_ITENS = int(os.environ.get('RESULT_CACHE_MAX_ITENS', 2000))
+    RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 86400))
+    RESULT_CACHE_REDIS_URL = os.environ.get('RESULT_CACHE_REDIS_URL')
+
+    # Invalidação dos caches locais entre workers por LISTEN/NOTIFY: 'postgres' ou 'off'
+    # (padrão: 'postgres' quando o banco é PostgreSQL)
+    INVALIDACAO_BUS = os.environ.get('INVALIDACAO_BUS')
+
+    # Cache das listas de cadastro usadas nos formulários: segundos de validade (0 desativa) e número máximo de listas
+    REFERENCIA_CACHE_TTL = int(os.environ.get('REFERENCIA_CACHE_TTL', 300))
+    REFERENCIA_CACHE_MAX = int(os.environ.get('REFERENCIA_CACHE_MAX', 4096))